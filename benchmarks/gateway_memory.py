@@ -0,0 +1,115 @@
+"""
+Resident memory and guild load time per gateway profile.
+
+Feeds synthetic GUILD_CREATE payloads straight into discord.py's connection
+state, with every member of every guild present as if the guilds had been
+chunked, and reports the RSS growth and time to build the cache. Each
+profile/size pair runs in a fresh interpreter so the numbers don't bleed
+into each other.
+
+    python -m benchmarks.gateway_memory --guilds 50 --members 100 1000 10000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import discord
+
+from helpers.gateway_config import PROFILES, gateway_options
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _guild_payload(guild_id: int, members: int) -> dict:
+    base_user_id = guild_id * 1_000_000
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "owner_id": str(base_user_id),
+        "member_count": members,
+        "large": members > 250,
+        "roles": [{
+            "id": str(guild_id), "name": "@everyone", "permissions": "0",
+            "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False
+        }],
+        "channels": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "members": [
+            {
+                "user": {
+                    "id": str(base_user_id + offset),
+                    "username": f"user{offset}",
+                    "discriminator": "0",
+                    "avatar": None,
+                },
+                "roles": [],
+                "joined_at": "2024-01-01T00:00:00+00:00",
+                "deaf": False,
+                "mute": False,
+                "flags": 0,
+            }
+            for offset in range(members)
+        ],
+    }
+
+
+def measure(profile: str, guilds: int, members: int) -> dict:
+    client = discord.Client(**gateway_options(profile))
+    state = client._connection
+    payloads = [_guild_payload(guild_id, members) for guild_id in range(1, guilds + 1)]
+
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    for payload in payloads:
+        state._add_guild_from_data(payload)
+    elapsed = time.perf_counter() - start
+    # Measure while the payloads are still alive so only the cache is counted
+    rss_growth = _rss_bytes() - rss_before
+
+    return {
+        "profile": profile,
+        "guilds": guilds,
+        "members_per_guild": members,
+        "cached_members": sum(len(guild._members) for guild in state._guilds.values()),
+        "rss_mb": round(rss_growth / 1024 / 1024, 1),
+        "load_seconds": round(elapsed, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=PROFILES)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(measure(args.profiles[0], args.guilds, args.members[0])))
+        return
+
+    print(f"{'profile':<8} {'members/guild':>13} {'cached':>10} {'rss MB':>8} {'load s':>8}")
+    for members in args.members:
+        for profile in args.profiles:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.gateway_memory", "--single",
+                 "--profiles", profile, "--guilds", str(args.guilds), "--members", str(members)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{result['profile']:<8} {result['members_per_guild']:>13} {result['cached_members']:>10} "
+                f"{result['rss_mb']:>8} {result['load_seconds']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,192 @@
+import time
+
+_process_started = time.perf_counter()
+
+import asyncio
 import logging
 import os
 import platform
-import webserver
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
 from helpers.SimplePointsManager import PointsManagerSingleton
-from cogs import EXTENSIONS
+from helpers.PointsClientRegistry import PointsClientRegistry
+from cogs import EXTENSIONS, DEFERRED_EXTENSIONS, DEFERRED_EXTENSION_TRIGGERS
 
 from helpers.DatabaseManager import DatabaseManager
+from helpers.OrganizationIndex import OrganizationIndex
+from helpers.command_sync import sync_if_changed
+from helpers.StartupProfiler import StartupProfiler
+from helpers.ShardMonitor import ShardMonitor
+from helpers.JobRunner import JobRunner
+from helpers import cooldowns
+from helpers.logging_config import setup_logging
+from helpers.gateway_config import gateway_options
+from helpers.tracing import TracedCommandTree, http_trace_config, PHASE_DISCORD
+from webserver import WebServer
 
-intents = discord.Intents.default()
-intents.members = True
-
-
-class LoggingFormatter(logging.Formatter):
-    # Colors
-    black = "\x1b[30m"
-    red = "\x1b[31m"
-    green = "\x1b[32m"
-    yellow = "\x1b[33m"
-    blue = "\x1b[34m"
-    gray = "\x1b[38m"
-    # Styles
-    reset = "\x1b[0m"
-    bold = "\x1b[1m"
-
-    COLORS = {
-        logging.DEBUG: gray + bold,
-        logging.INFO: blue + bold,
-        logging.WARNING: yellow + bold,
-        logging.ERROR: red,
-        logging.CRITICAL: red + bold,
-    }
-
-    def format(self, record):
-        log_color = self.COLORS[record.levelno]
-        format = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
-        format = format.replace("(black)", self.black + self.bold)
-        format = format.replace("(reset)", self.reset)
-        format = format.replace("(levelcolor)", log_color)
-        format = format.replace("(green)", self.green + self.bold)
-        formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
-        return formatter.format(record)
-
+_imports_done = time.perf_counter()
 
 logger = logging.getLogger("discord_bot")
-logger.setLevel(logging.INFO)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(LoggingFormatter())
-# File handler
-file_handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
-file_handler_formatter = logging.Formatter(
-    "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
-)
-file_handler.setFormatter(file_handler_formatter)
 
-# Add the handlers
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
 
+def _shard_settings() -> tuple:
+    """
+    Read SHARD_COUNT and SHARD_IDS from the environment.
+
+    SHARD_COUNT defaults to 1 (a single gateway connection); "auto" uses the
+    count Discord recommends. SHARD_IDS picks which of those shards this
+    process runs, as a comma separated list that may contain ranges ("0-3,8"),
+    so a large bot can be spread across several processes.
+    """
+    raw_count = os.getenv("SHARD_COUNT", "1").strip().lower()
+    shard_count = None if raw_count == "auto" else int(raw_count)
 
-class DiscordBot(commands.Bot):
-    def __init__(self) -> None:
+    shard_ids = None
+    raw_ids = os.getenv("SHARD_IDS", "").strip()
+    if raw_ids:
+        shard_ids = []
+        for part in raw_ids.split(","):
+            part = part.strip()
+            if "-" in part:
+                first, last = (int(bound) for bound in part.split("-", 1))
+                shard_ids.extend(range(first, last + 1))
+            elif part:
+                shard_ids.append(int(part))
+        if shard_count is None:
+            raise ValueError("SHARD_IDS requires an explicit SHARD_COUNT")
+        if any(shard_id < 0 or shard_id >= shard_count for shard_id in shard_ids):
+            raise ValueError(f"SHARD_IDS must be between 0 and {shard_count - 1}")
+
+    return shard_count, shard_ids
+
+
+class DiscordBot(commands.AutoShardedBot):
+    def __init__(self, profiler: StartupProfiler) -> None:
+        shard_count, shard_ids = _shard_settings()
         super().__init__(
             command_prefix=commands.when_mentioned,
-            intents=intents
+            **gateway_options(),
+            shard_count=shard_count,
+            shard_ids=shard_ids,
+            tree_cls=TracedCommandTree,
+            http_trace=http_trace_config(PHASE_DISCORD)
         )
         self.logger = logger
+        self.profiler = profiler
         self._connected = False
+        self._deferred_extensions = set(DEFERRED_EXTENSIONS)
 
         # Initialize the points manager and store it as an attribute
+        hedge_percentile = os.getenv("POINTS_HEDGE_PERCENTILE")
         self.points_manager = PointsManagerSingleton(
             base_url=os.getenv("API_BASE_URL"),
             api_key=os.getenv("API_KEY"),
-            realm_id=os.getenv("REALM_ID")
+            realm_id=os.getenv("REALM_ID"),
+            hedge_percentile=float(hedge_percentile) if hedge_percentile else None,
+            hedge_budget=float(os.getenv("POINTS_HEDGE_BUDGET", "0.05"))
         )
+        # Per-guild realm clients; guilds without a mapping use the default above
+        self.points_clients = PointsClientRegistry.from_env(self.points_manager)
         # Initialize the database manager
         self.db_manager = DatabaseManager.get_instance(os.getenv("DATABASE_URL"))
+        # In-memory organization name index used by autocomplete
+        self.org_index = OrganizationIndex()
+        # Health, readiness and metrics endpoints, served from the bot's loop
+        self.web_server = WebServer(self, port=int(os.getenv("PORT", "8080")))
+        # Per-shard latency and event rate, exported on /metrics and /healthz
+        self.shard_monitor = ShardMonitor(self)
+        # Background fan-out for long-running commands such as pay_org
+        self.job_runner = JobRunner(self, concurrency=int(os.getenv("JOB_CONCURRENCY", "8")))
+        self.tree.on_error = self.on_app_command_error
+        # Shard whose process runs the payment scheduler; IN_BOT_SCHEDULER=0
+        # leaves payouts to a separate `python -m scheduler_worker` process
+        self.scheduler_shard = int(os.getenv("SCHEDULER_SHARD", "0"))
+        self.in_bot_scheduler = os.getenv("IN_BOT_SCHEDULER", "1").lower() not in ("0", "false", "no")
+
+    @property
+    def runs_scheduler(self) -> bool:
+        """Whether this process should run the payment scheduler."""
+        if not self.in_bot_scheduler:
+            return False
+        if self.shard_ids is not None:
+            return self.scheduler_shard in self.shard_ids
+        return self.shard_count is None or self.scheduler_shard < self.shard_count
+
+    async def _load_extension_logged(self, extension: str) -> None:
+        start = time.perf_counter()
+        try:
+            await self.load_extension(extension)
+            self.logger.info(
+                f"Loaded extension '{extension}' in {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+        except Exception as e:
+            exception = f"{type(e).__name__}: {e}"
+            self.logger.error(
+                f"Failed to load extension {extension}\n{exception}"
+            )
 
     async def load_cogs(self) -> None:
         """
         The code in this function is executed whenever the bot will start.
+
+        Cogs don't depend on each other, so they are loaded concurrently.
+        Debug-only extensions are deferred until an owner first invokes them.
         """
-        for extension in EXTENSIONS:
-            try:
-                await self.load_extension(extension)
-                self.logger.info(f"Loaded extension '{extension}'")
-            except Exception as e:
-                exception = f"{type(e).__name__}: {e}"
-                self.logger.error(
-                    f"Failed to load extension {extension}\n{exception}"
-                )
+        await asyncio.gather(*(
+            self._load_extension_logged(extension)
+            for extension in EXTENSIONS
+            if extension not in self._deferred_extensions
+        ))
+
+    async def on_message(self, message: discord.Message) -> None:
+        if (
+            self._deferred_extensions
+            and not message.author.bot
+            and self.user.id in message.raw_mentions
+        ):
+            await self._load_deferred_extension(message)
+        await self.process_commands(message)
+
+    async def _load_deferred_extension(self, message: discord.Message) -> None:
+        ctx = await self.get_context(message)
+        extension = DEFERRED_EXTENSION_TRIGGERS.get(ctx.invoked_with or "")
+        if extension not in self._deferred_extensions:
+            return
+        if not await self.is_owner(message.author):
+            return
+        self._deferred_extensions.discard(extension)
+        await self._load_extension_logged(extension)
+
+    async def sync_commands(self) -> None:
+        """
+        Sync application commands only when the tree changed since the last sync.
+
+        Set DEV_GUILD_IDS (comma separated) to sync to those guilds instead of
+        globally, which makes new commands show up instantly while developing.
+        Set FORCE_COMMAND_SYNC=1 to sync regardless of the stored hash.
+        """
+        state_path = os.getenv(
+            "COMMAND_SYNC_STATE",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".command_tree_hash.json")
+        )
+        force = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+        dev_guild_ids = [
+            int(guild_id) for guild_id in os.getenv("DEV_GUILD_IDS", "").split(",")
+            if guild_id.strip()
+        ]
+
+        if not dev_guild_ids:
+            await sync_if_changed(self.tree, state_path, force=force)
+            return
+
+        for guild_id in dev_guild_ids:
+            guild = discord.Object(id=guild_id)
+            self.tree.copy_global_to(guild=guild)
+            await sync_if_changed(self.tree, state_path, guild=guild, force=force)
 
     async def setup_hook(self) -> None:
         """
@@ -117,47 +208,106 @@ class DiscordBot(commands.Bot):
             # Ensure directory is writable
             os.chmod(current_dir, 0o755)
             
-            self.db_manager = DatabaseManager.get_instance(db_url)
-            print("Database initialized")
+            with self.profiler.phase("database"):
+                self.db_manager = DatabaseManager.get_instance(db_url)
+            self.logger.info("Database initialized")
 
-            # Load extensions
-            await self.load_extension("cogs.menu")
-            print("Extensions loaded")
-            
-            # Load cogs
-            await self.load_extension("cogs.organizations")
+            with self.profiler.phase("org index"):
+                session = self.db_manager.Session()
+                try:
+                    self.org_index.load(session)
+                finally:
+                    session.close()
+            self.logger.info(f"Indexed {len(self.org_index)} organizations")
+
+            # Keep command cooldowns across restarts when enabled
+            if os.getenv("COOLDOWN_PERSIST", "").lower() in ("1", "true", "yes"):
+                cooldowns.store.enable_persistence(self.db_manager)
+
+            await self.web_server.start()
+            self.shard_monitor.start()
+            self.points_clients.start()
+
+            # Load extensions listed in cogs.EXTENSIONS
+            with self.profiler.phase("extensions"):
+                await self.load_cogs()
+            self.logger.info("Extensions loaded")
+
+            # Pick up background jobs interrupted by the last shutdown
+            resumed = await self.job_runner.resume()
+            if resumed:
+                self.logger.info(f"Resumed {resumed} background job(s)")
             
-            # Sync commands
-            await self.tree.sync()
+            # Sync commands, skipped when the tree is unchanged
+            with self.profiler.phase("sync"):
+                await self.sync_commands()
+
+            self.profiler.report()
             
         except Exception as e:
-            print(f"Error in setup: {e}")
+            self.logger.exception("Error in setup", extra={"error": str(e)})
             raise  # Re-raise to see full traceback
 
+    async def on_app_command_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ) -> None:
+        """Tell users how long to wait on a cooldown; anything else is logged as usual."""
+        if isinstance(error, app_commands.CommandOnCooldown):
+            if not interaction.response.is_done():
+                await interaction.response.send_message(embed=cooldowns.cooldown_embed(error), ephemeral=True)
+            return
+        await app_commands.CommandTree.on_error(self.tree, interaction, error)
+
     async def on_ready(self) -> None:
         """|coro|
 
         Overriding :meth:`~discord.Client.on_ready`, to do some basic connect/reconnect info
         """
         await self.wait_until_ready()
-        await self.tree.sync()
         if not self._connected:
+            self._connected = True
             self.logger.info("Bot is ready!" + self.user.name)
-            self.logger.info("synced!")
         else:
             self.logger.info("Bot reconnected.")
 
+    async def on_shard_ready(self, shard_id: int) -> None:
+        self.logger.info(f"Shard {shard_id} ready", extra={"shard_id": shard_id})
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self.logger.warning(f"Shard {shard_id} disconnected", extra={"shard_id": shard_id})
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        self.logger.info(f"Shard {shard_id} resumed", extra={"shard_id": shard_id})
+
     async def close(self) -> None:
         """
         This is called when the bot is shutting down.
-        Clean up the points manager session.
+        Stop the web server and clean up the points client sessions.
         """
+        self.shard_monitor.stop()
+        await self.job_runner.close()
+        await cooldowns.store.close()
+        await self.web_server.stop()
+        await self.points_clients.close()
         await self.points_manager.cleanup()
         await super().close()
 
 
 load_dotenv(override=True)
 
-bot = DiscordBot()
-webserver.keep_alive()
-bot.run(os.getenv("DISCORD_TOKEN"))
+log_listener = setup_logging(
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+    json_file=os.getenv("LOG_FORMAT", "").lower() == "json"
+)
+
+profiler = StartupProfiler(logger, started_at=_process_started)
+profiler.record("imports", _imports_done - _process_started)
+
+bot = DiscordBot(profiler)
+try:
+    bot.run(os.getenv("DISCORD_TOKEN"))
+finally:
+    # Flush whatever is still queued before the process exits
+    log_listener.stop()
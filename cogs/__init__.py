@@ -6,3 +6,14 @@ EXTENSIONS: Tuple[str, ...] = (
     "cogs.organizations",
     "cogs.menu",
 )
+
+# Debug-only extensions: not loaded at startup, only the first time an owner invokes them
+DEFERRED_EXTENSIONS: Tuple[str, ...] = (
+    "jishaku",
+)
+
+# Prefix command names that trigger loading a deferred extension
+DEFERRED_EXTENSION_TRIGGERS = {
+    "jsk": "jishaku",
+    "jishaku": "jishaku",
+}
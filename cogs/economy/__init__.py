@@ -2,6 +2,8 @@ from discord.ext import commands
 import discord
 from discord import app_commands
 from helpers.embed_helpers import create_basic_embed, create_success_embed, create_error_embed
+from helpers.SimplePointsManager import PointsClient
+from helpers.cooldowns import token_bucket, cooldown_embed
 
 def is_admin():
     def predicate(interaction: discord.Interaction) -> bool:
@@ -11,7 +13,10 @@ def is_admin():
 class Economy(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.points_manager = bot.points_manager
+
+    def _points(self, interaction: discord.Interaction) -> PointsClient:
+        """Points client for the realm the interaction's guild is mapped to"""
+        return self.bot.points_clients.for_guild(interaction.guild_id)
 
     @app_commands.guild_only()
     @app_commands.command(name="balance", description="Check your Points balance")
@@ -19,7 +24,7 @@ class Economy(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            balance = await self.points_manager.get_balance(interaction.user.id)
+            balance = await self._points(interaction).get_balance(interaction.user.id)
             embed = create_basic_embed(
                 title="Balance Check",
                 description=f"Your current balance: **{balance:,}** Points"
@@ -39,6 +44,7 @@ class Economy(commands.Cog):
         user="The user to tip",
         amount="Amount of Points to tip"
     )
+    @token_bucket("tip", user=(5, 60), guild=(120, 60))
     async def tip(self, interaction: discord.Interaction, user: discord.Member, amount: int):
         await interaction.response.defer(ephemeral=True)
         
@@ -67,29 +73,38 @@ class Economy(commands.Cog):
             return
         
         try:
-            sender_balance = await self.points_manager.get_balance(interaction.user.id)
-            if sender_balance < amount:
-                embed = create_error_embed(
-                    title="Insufficient Balance",
-                    description=f"You don't have enough Points!\nYour balance: **{sender_balance:,}** Points"
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-                return
-
-            success = await self.points_manager.transfer_points(
+            # Transfer straight away; DRIP rejects tips the sender can't cover,
+            # so the balance is only read to explain that rejection
+            result = await self._points(interaction).transfer_points(
                 interaction.user.id,
                 user.id,
                 amount
             )
             
-            if success:
+            if result:
                 embed = create_success_embed(
                     title="Tip Successful",
                     description=f"Successfully tipped **{amount:,}** Points to {user.mention}!"
                 )
                 embed.set_footer(text=f"From: {interaction.user.name}")
                 await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+
+            # Client errors whose wording we don't recognise are checked against the balance
+            sender_balance = None
+            if result.status < 500:
+                sender_balance = await self._points(interaction).get_balance(interaction.user.id)
+            if result.insufficient_funds or (sender_balance is not None and sender_balance < amount):
+                embed = create_error_embed(
+                    title="Insufficient Balance",
+                    description=f"You don't have enough Points!\nYour balance: **{sender_balance:,}** Points"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
             else:
+                self.bot.logger.warning(
+                    "Tip transfer failed",
+                    extra={"user_id": interaction.user.id, "status": result.status, "error": result.message}
+                )
                 embed = create_error_embed(
                     title="Transfer Failed",
                     description="Failed to transfer Points. Please try again later."
@@ -117,7 +132,7 @@ class Economy(commands.Cog):
             return
         
         try:
-            balance = await self.points_manager.get_balance(user.id)
+            balance = await self._points(interaction).get_balance(user.id)
             embed = create_basic_embed(
                 title=f"Balance Check for {user.name}",
                 description=f"Current balance: **{balance:,}** Points"
@@ -137,6 +152,7 @@ class Economy(commands.Cog):
         user="The user to add Points to",
         amount="Amount of Points to add"
     )
+    @token_bucket("add", user=(10, 60), guild=(60, 60))
     @is_admin()
     async def add_points(self, interaction: discord.Interaction, user: discord.Member, amount: int):
         await interaction.response.defer(ephemeral=True)
@@ -158,9 +174,11 @@ class Economy(commands.Cog):
             return
         
         try:
-            success = await self.points_manager.add_points(user.id, amount)
-            if success:
-                new_balance = await self.points_manager.get_balance(user.id)
+            result = await self._points(interaction).add_points(user.id, amount)
+            if result:
+                new_balance = result.balance
+                if new_balance is None:
+                    new_balance = await self._points(interaction).get_balance(user.id)
                 embed = create_success_embed(
                     title="Points Added",
                     description=f"Successfully added **{amount:,}** Points to {user.mention}\nNew balance: **{new_balance:,}** Points"
@@ -186,6 +204,7 @@ class Economy(commands.Cog):
         user="The user to remove Points from",
         amount="Amount of Points to remove"
     )
+    @token_bucket("remove", user=(10, 60), guild=(60, 60))
     @is_admin()
     async def remove_points(self, interaction: discord.Interaction, user: discord.Member, amount: int):
         await interaction.response.defer(ephemeral=True)
@@ -207,7 +226,7 @@ class Economy(commands.Cog):
             return
         
         try:
-            current_balance = await self.points_manager.get_balance(user.id)
+            current_balance = await self._points(interaction).get_balance(user.id)
             if current_balance < amount:
                 embed = create_error_embed(
                     title="Insufficient Balance",
@@ -216,9 +235,12 @@ class Economy(commands.Cog):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
 
-            success = await self.points_manager.remove_points(user.id, amount)
-            if success:
-                new_balance = await self.points_manager.get_balance(user.id)
+            # The balance read above gives the new balance when DRIP's response doesn't
+            result = await self._points(interaction).remove_points(user.id, amount, current_balance)
+            if result:
+                new_balance = result.balance
+                if new_balance is None:
+                    new_balance = await self._points(interaction).get_balance(user.id)
                 embed = create_success_embed(
                     title="Points Removed",
                     description=f"Successfully removed **{amount:,}** Points from {user.mention}\nNew balance: **{new_balance:,}** Points"
@@ -241,7 +263,9 @@ class Economy(commands.Cog):
     @add_points.error
     @remove_points.error
     async def admin_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
-        if isinstance(error, app_commands.CheckFailure):
+        if isinstance(error, app_commands.CommandOnCooldown):
+            await interaction.response.send_message(embed=cooldown_embed(error), ephemeral=True)
+        elif isinstance(error, app_commands.CheckFailure):
             embed = create_error_embed(
                 title="Permission Denied",
                 description="You don't have permission to use this command!"
@@ -1,7 +1,15 @@
 from discord.ext import commands
 import discord
 from discord import app_commands
+from helpers.AssetCache import AssetCache
+from helpers.embed_templates import get_embed
+from helpers.schedule_archive import find_schedule
+from helpers.payout_ledger import record_payouts, fetch_payout_page
+from helpers.tracing import TracedView, TracedModal
+from helpers.PaymentScheduler import PaymentScheduler
+from helpers.cooldowns import token_bucket
 from helpers.embed_helpers import (
+    FOOTER_TEXT,
     create_basic_embed, 
     create_error_embed, 
     create_success_embed,
@@ -11,140 +19,109 @@ from typing import Optional, List
 from models.database import Organization, OrganizationMember, PaymentSchedule, IntervalType, PaymentScheduleMember
 from datetime import datetime, timedelta
 import asyncio
+import os
 
-class MainView(discord.ui.View):
-    def __init__(self, bot):
-        super().__init__(timeout=180)
-        self.bot = bot
-
-        # Main menu buttons
-        org_manager_btn = discord.ui.Button(
-            label="Organization Manager",
-            style=discord.ButtonStyle.primary,
-            emoji="🏢",
-            custom_id="org_manager"
-        )
-        payment_manager_btn = discord.ui.Button(
-            label="Payment Manager",
-            style=discord.ButtonStyle.primary,
-            emoji="💰",
-            custom_id="payment_manager"
-        )
-        help_btn = discord.ui.Button(
-            label="Help & Commands",
-            style=discord.ButtonStyle.secondary,
-            emoji="❔",
-            custom_id="help"
-        )
-
-        self.add_item(org_manager_btn)
-        self.add_item(payment_manager_btn)
-        self.add_item(help_btn)
-
-        org_manager_btn.callback = self.org_manager_callback
-        payment_manager_btn.callback = self.payment_manager_callback
-        help_btn.callback = self.help_callback
-
-    async def org_manager_callback(self, interaction: discord.Interaction):
-        embed = discord.Embed(color=0x2B2D31)
-        embed.title = "Organization Manager"
-        embed.description = (
-            "Create and manage your organizations\n\n"
-            "**Available Commands**\n"
-            "• `/org create` - Create a new organization\n"
-            "• `/org invite` - Invite members to your organization\n"
-            "• `/org kick` - Remove members from your organization\n"
-            "• `/org transfer` - Transfer organization ownership\n"
-            "• `/pay_org` - Create automated payments for your organization"
-        )
-        embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-        
-        await interaction.response.edit_message(
-            embed=embed,
-            view=OrganizationManagerView(self.bot)
-        )
+BANNER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "celeris.png"
+)
 
-    async def payment_manager_callback(self, interaction: discord.Interaction):
-        embed = discord.Embed(color=0x2B2D31)
-        embed.title = "Payment Manager"
-        embed.description = (
-            "Manage payment schedules and view history\n\n"
-            "**Available Commands**\n"
-            "• `/pay` - Create individual payment schedule\n"
-            "• `/pay_org` - Create organization payment schedule\n"
-            "• `/schedule list` - View your active schedules\n"
-            "• `/schedule cancel` - Cancel a payment schedule"
-        )
-        embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-        
-        await interaction.response.edit_message(
-            embed=embed,
-            view=PaymentManagerView(self.bot)
-        )
+class MenuViews:
+    """
+    One long-lived instance of each menu view, shared by every menu message.
 
-    async def help_callback(self, interaction: discord.Interaction):
-        embed = discord.Embed(color=0x2B2D31)
-        embed.title = "Available Commands"
-        embed.description = (
-            "Here are all available commands:\n\n"
-            "**Payment Commands**\n"
-            "• `/pay @user <amount> <interval> <total>` - Create individual payment schedule\n"
-            "• `/pay_org <org> <amount> <interval> <total>` - Create organization payment schedule\n"
-            "• `/cancel_schedule <id>` - Cancel a payment schedule\n\n"
-            "**Organization Commands**\n"
-            "• `/org create <name>` - Create a new organization\n"
-            "• `/org invite @user` - Invite someone to your organization\n"
-            "• `/org kick @user` - Remove someone from your organization"
-        )
-        embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-        
-        await interaction.response.edit_message(embed=embed, view=self)
+    ``register`` adds a handler instance of each view with ``bot.add_view`` so
+    clicks are routed by custom_id, on any message and across restarts. The
+    instances sent with responses are stopped twins used only as component
+    layouts, so discord.py never tracks a view object per open menu.
+    """
 
-class OrganizationManagerView(discord.ui.View):
     def __init__(self, bot):
-        super().__init__(timeout=180)
         self.bot = bot
-
-        create_org_btn = discord.ui.Button(
-            label="Create Organization",
-            style=discord.ButtonStyle.success,
-            emoji="➕",
-            custom_id="create_org"
-        )
-        my_orgs_btn = discord.ui.Button(
-            label="My Organizations",
-            style=discord.ButtonStyle.primary,
-            emoji="📋",
-            custom_id="my_orgs"
-        )
-        back_btn = discord.ui.Button(
-            label="Back",
-            style=discord.ButtonStyle.secondary,
-            emoji="⬅️",
-            custom_id="back"
+        self.main = self._layout(MainView(self))
+        self.org_manager = self._layout(OrganizationManagerView(self))
+        self.payment_manager = self._layout(PaymentManagerView(self))
+
+    @staticmethod
+    def _layout(view: discord.ui.View) -> discord.ui.View:
+        view.stop()
+        return view
+
+    def register(self):
+        for view_cls in (MainView, OrganizationManagerView, PaymentManagerView):
+            self.bot.add_view(view_cls(self))
+
+class MainView(TracedView):
+    def __init__(self, views: MenuViews):
+        super().__init__(timeout=None)
+        self.views = views
+        self.bot = views.bot
+
+    @discord.ui.button(
+        label="Organization Manager",
+        style=discord.ButtonStyle.primary,
+        emoji="🏢",
+        custom_id="celeris:main:org_manager"
+    )
+    async def org_manager_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(
+            embed=get_embed("org_manager"),
+            view=self.views.org_manager
         )
 
-        self.add_item(create_org_btn)
-        self.add_item(my_orgs_btn)
-        self.add_item(back_btn)
-
-        create_org_btn.callback = self.create_org_callback
-        my_orgs_btn.callback = self.my_orgs_callback
-        back_btn.callback = self.back_callback
+    @discord.ui.button(
+        label="Payment Manager",
+        style=discord.ButtonStyle.primary,
+        emoji="💰",
+        custom_id="celeris:main:payment_manager"
+    )
+    async def payment_manager_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(
+            embed=get_embed("payment_manager"),
+            view=self.views.payment_manager
+        )
 
-    async def create_org_callback(self, interaction: discord.Interaction):
+    @discord.ui.button(
+        label="Help & Commands",
+        style=discord.ButtonStyle.secondary,
+        emoji="❔",
+        custom_id="celeris:main:help"
+    )
+    async def help_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(embed=get_embed("help"), view=self.views.main)
+
+class OrganizationManagerView(TracedView):
+    def __init__(self, views: MenuViews):
+        super().__init__(timeout=None)
+        self.views = views
+        self.bot = views.bot
+
+    @discord.ui.button(
+        label="Create Organization",
+        style=discord.ButtonStyle.success,
+        emoji="➕",
+        custom_id="celeris:org_manager:create_org"
+    )
+    async def create_org_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(CreateOrgModal(self.bot))
 
-    async def my_orgs_callback(self, interaction: discord.Interaction):
+    @discord.ui.button(
+        label="My Organizations",
+        style=discord.ButtonStyle.primary,
+        emoji="📋",
+        custom_id="celeris:org_manager:my_orgs"
+    )
+    async def my_orgs_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
         session = self.bot.db_manager.Session()
         try:
             orgs = session.query(Organization).join(
                 OrganizationMember,
                 Organization.id == OrganizationMember.organization_id
             ).filter(
-                (Organization.owner_id == str(interaction.user.id)) |
-                (OrganizationMember.user_id == str(interaction.user.id))
-            ).all()
+                Organization.guild_id == interaction.guild_id,
+                (Organization.owner_id == interaction.user.id) |
+                (OrganizationMember.user_id == interaction.user.id)
+            ).distinct().all()
 
             embed = discord.Embed(color=0x2B2D31)
             embed.title = "My Organizations"
@@ -168,7 +145,7 @@ class OrganizationManagerView(discord.ui.View):
                 for org in orgs:
                     member_count = session.query(OrganizationMember)\
                         .filter_by(organization_id=org.id).count()
-                    is_owner = org.owner_id == str(interaction.user.id)
+                    is_owner = org.owner_id == interaction.user.id
                     embed.add_field(
                         name=f"{'👑' if is_owner else '👤'} {org.name}",
                         value=(
@@ -179,8 +156,8 @@ class OrganizationManagerView(discord.ui.View):
                         inline=False
                     )
 
-            embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-            await interaction.response.edit_message(embed=embed, view=self)
+            embed.set_footer(text=FOOTER_TEXT)
+            await interaction.response.edit_message(embed=embed, view=self.views.org_manager)
 
         except Exception as e:
             embed = discord.Embed(
@@ -188,21 +165,24 @@ class OrganizationManagerView(discord.ui.View):
                 description=f"Failed to fetch organizations: {str(e)}",
                 color=discord.Color.red()
             )
-            embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-            await interaction.response.edit_message(embed=embed, view=self)
+            embed.set_footer(text=FOOTER_TEXT)
+            await interaction.response.edit_message(embed=embed, view=self.views.org_manager)
         finally:
             session.close()
 
-    async def back_callback(self, interaction: discord.Interaction):
+    @discord.ui.button(
+        label="Back",
+        style=discord.ButtonStyle.secondary,
+        emoji="⬅️",
+        custom_id="celeris:org_manager:back"
+    )
+    async def back_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.edit_message(
-            embed=create_basic_embed(
-                title="Main Menu",
-                description="Select an option below:"
-            ),
-            view=MainView(self.bot)
+            embed=get_embed("main_menu"),
+            view=self.views.main
         )
 
-class CreateOrgModal(discord.ui.Modal, title="Create Organization"):
+class CreateOrgModal(TracedModal, title="Create Organization"):
     def __init__(self, bot):
         super().__init__()
         self.bot = bot
@@ -219,7 +199,10 @@ class CreateOrgModal(discord.ui.Modal, title="Create Organization"):
         session = self.bot.db_manager.Session()
         try:
             # Check if organization name already exists
-            existing_org = session.query(Organization).filter_by(name=self.org_name.value).first()
+            existing_org = session.query(Organization).filter_by(
+                guild_id=interaction.guild_id,
+                name=self.org_name.value
+            ).first()
             if existing_org:
                 await interaction.response.send_message(
                     embed=create_error_embed(
@@ -232,8 +215,9 @@ class CreateOrgModal(discord.ui.Modal, title="Create Organization"):
 
             # Create new organization
             new_org = Organization(
+                guild_id=interaction.guild_id,
                 name=self.org_name.value,
-                owner_id=str(interaction.user.id),
+                owner_id=interaction.user.id,
                 created_at=datetime.utcnow()
             )
             session.add(new_org)
@@ -242,12 +226,17 @@ class CreateOrgModal(discord.ui.Modal, title="Create Organization"):
             # Add owner as member
             member = OrganizationMember(
                 organization_id=new_org.id,
-                user_id=str(interaction.user.id),
+                user_id=interaction.user.id,
                 joined_at=datetime.utcnow()
             )
             session.add(member)
             session.commit()
 
+            self.bot.org_index.add_organization(
+                new_org.id, new_org.guild_id, new_org.name, new_org.owner_id
+            )
+            self.bot.org_index.add_member(new_org.id, member.user_id)
+
             await interaction.response.send_message(
                 embed=create_success_embed(
                     title="Organization Created",
@@ -268,168 +257,236 @@ class CreateOrgModal(discord.ui.Modal, title="Create Organization"):
         finally:
             session.close()
 
-class PaymentManagerView(discord.ui.View):
-    def __init__(self, bot):
+class PaymentManagerView(TracedView):
+    def __init__(self, views: MenuViews):
+        super().__init__(timeout=None)
+        self.views = views
+        self.bot = views.bot
+
+    @discord.ui.button(
+        label="Back",
+        style=discord.ButtonStyle.secondary,
+        emoji="⬅️",
+        custom_id="celeris:payment_manager:back"
+    )
+    async def back_callback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(
+            embed=get_embed("main_menu"),
+            view=self.views.main
+        )
+
+class HistoryView(TracedView):
+    PAGE_SIZE = 10
+
+    def __init__(
+        self,
+        bot,
+        viewer_id: int,
+        guild_id: int,
+        user_id: Optional[int] = None,
+        schedule_id: Optional[int] = None
+    ):
         super().__init__(timeout=180)
         self.bot = bot
+        self.viewer_id = viewer_id
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.schedule_id = schedule_id
+        # Keyset cursors of the first and last rows on the current page
+        self.first_cursor = None
+        self.last_cursor = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.viewer_id
+
+    def load_page(self, before=None, after=None) -> discord.Embed:
+        session = self.bot.db_manager.Session()
+        try:
+            payouts, has_more = fetch_payout_page(
+                session,
+                guild_id=self.guild_id,
+                user_id=self.user_id,
+                schedule_id=self.schedule_id,
+                before=before,
+                after=after,
+                limit=self.PAGE_SIZE
+            )
+        finally:
+            session.close()
 
-        back_btn = discord.ui.Button(
-            label="Back",
-            style=discord.ButtonStyle.secondary,
-            emoji="⬅️",
-            custom_id="back"
-        )
-        self.add_item(back_btn)
-        back_btn.callback = self.back_callback
+        if after is not None:
+            has_newer, has_older = has_more, True
+        else:
+            has_newer, has_older = before is not None, has_more
+
+        if payouts:
+            self.first_cursor = (payouts[0].paid_at, payouts[0].id)
+            self.last_cursor = (payouts[-1].paid_at, payouts[-1].id)
+        self.newer_button.disabled = not (payouts and has_newer)
+        self.older_button.disabled = not (payouts and has_older)
+
+        if self.schedule_id is not None:
+            title = f"Payout History • Schedule #{self.schedule_id}"
+        else:
+            title = "Payout History"
+
+        if not payouts:
+            return create_basic_embed(title=title, description="No payouts found.", add_footer=True)
+
+        lines = [
+            f"{discord.utils.format_dt(payout.paid_at, style='f')} • "
+            f"**{payout.amount:,}** points → <@{payout.user_id}> • Schedule #{payout.schedule_id}"
+            for payout in payouts
+        ]
+        return create_basic_embed(title=title, description="\n".join(lines), add_footer=True)
+
+    @discord.ui.button(label="Newer", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    async def newer_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = self.load_page(after=self.first_cursor)
+        await interaction.response.edit_message(embed=embed, view=self)
 
-    async def back_callback(self, interaction: discord.Interaction):
-        await interaction.response.edit_message(
-            embed=create_basic_embed(
-                title="Main Menu",
-                description="Select an option below:"
-            ),
-            view=MainView(self.bot)
-        )
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.secondary, emoji="➡️")
+    async def older_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = self.load_page(before=self.last_cursor)
+        await interaction.response.edit_message(embed=embed, view=self)
 
 class Menu(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.payment_task = bot.loop.create_task(self.process_payments())
-
+        # Banner is read from disk once; later /start calls reuse its CDN URL
+        self.banner = AssetCache(BANNER_PATH, "celeris.png")
+        # Menu views are built and registered once, then shared by every menu
+        self.views = MenuViews(bot)
+        self.views.register()
+        self.scheduler = PaymentScheduler(bot, bot.db_manager, bot.points_clients, bot.logger)
+        # Only one process pays out: the owner of the scheduler shard, unless
+        # the in-bot scheduler is disabled in favour of scheduler_worker
+        if bot.runs_scheduler:
+            self.scheduler.start()
+
+    async def cog_unload(self):
+        # Stop the loops so a reload doesn't leave a second copy running; waits
+        # for the payment pass in flight so applied payouts are recorded
+        await self.scheduler.close()
+
+    @app_commands.guild_only()
     @app_commands.command(name="start", description="Get started with Celeris")
     async def menu(self, interaction: discord.Interaction):
-        embed = discord.Embed(color=0x2B2D31)  # Dark theme color
-        embed.title = "Welcome to Celeris"
-        embed.description = "Get Started\n\nCreate and manage organizations, automate payments, and more!"
-        
-        # Key Features section
-        embed.add_field(
-            name="🔑 Key Features",
-            value="• Create organizations\n• Set up automated payments\n• Manage members and roles\n• Track payment history",
-            inline=False
-        )
-        
-        # Quick Start section
-        embed.add_field(
-            name="💡 Quick Start",
-            value="Click 'Create Organization' to begin!",
-            inline=False
-        )
-        
+        embed = get_embed("welcome")
+
+        # Reuse the banner already on Discord's CDN when we have a live URL
+        cdn_url = self.banner.cdn_url
+        if cdn_url:
+            embed.set_image(url=cdn_url)
+            await interaction.response.send_message(
+                embed=embed,
+                view=self.views.main,
+                ephemeral=True
+            )
+            return
+
         # Add the Celeris image
-        embed.set_image(url="attachment://celeris.png")
-        
-        # Add footer
-        embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-        
-        # Create file object for the image
-        file = discord.File("celeris.png", filename="celeris.png")
-        
+        embed.set_image(url=self.banner.attachment_url)
         await interaction.response.send_message(
-            file=file,
+            file=self.banner.file(),
             embed=embed,
-            view=MainView(self.bot),
+            view=self.views.main,
             ephemeral=True
         )
+        try:
+            self.banner.remember(await interaction.original_response())
+        except discord.HTTPException as e:
+            self.bot.logger.warning(f"Failed to cache banner URL: {e}")
 
-    async def process_payments(self):
-        while True:
-            try:
-                current_time = datetime.utcnow()
-                session = self.bot.db_manager.Session()
-
-                # Process individual payments
-                individual_schedules = session.query(PaymentSchedule)\
-                    .join(PaymentScheduleMember)\
-                    .filter(
-                        PaymentSchedule.organization_id.is_(None),
-                        PaymentSchedule.points_paid < PaymentSchedule.total_points
-                    ).all()
-
-                for schedule in individual_schedules:
-                    # Calculate time since last payment
-                    time_since_last = current_time - schedule.last_paid_at
-                    interval_seconds = schedule.interval_value
-                    
-                    # Convert interval to seconds
-                    if schedule.interval_type == IntervalType.MINUTES:
-                        interval_seconds *= 60
-                    elif schedule.interval_type == IntervalType.HOURS:
-                        interval_seconds *= 3600
-                    elif schedule.interval_type == IntervalType.DAYS:
-                        interval_seconds *= 86400
-                    elif schedule.interval_type == IntervalType.MONTHS:
-                        interval_seconds *= 2592000  # 30 days approximation
-
-                    if time_since_last.total_seconds() >= interval_seconds:
-                        members = session.query(PaymentScheduleMember)\
-                            .filter_by(schedule_id=schedule.id)\
-                            .all()
-
-                        for member in members:
-                            try:
-                                # Check if we've reached total points
-                                if schedule.points_paid >= schedule.total_points:
-                                    continue
-
-                                # Calculate remaining points
-                                remaining = schedule.total_points - schedule.points_paid
-                                payment_amount = min(schedule.amount, remaining)
-
-                                # Process the payment
-                                success = await self.bot.points_manager.add_points(
-                                    user_id=int(member.user_id),
-                                    amount=payment_amount
-                                )
-
-                                if success:
-                                    # Update schedule
-                                    schedule.points_paid += payment_amount
-                                    schedule.last_paid_at = current_time
-                                    
-                                    # Send DM notification
-                                    try:
-                                        user = await self.bot.fetch_user(int(member.user_id))
-                                        progress, progress_bar = calculate_schedule_progress(
-                                            schedule.points_paid,
-                                            schedule.total_points
-                                        )
-
-                                        embed = create_success_embed(
-                                            title="Payment Received",
-                                            description=(
-                                                "**Individual Payment**\n"
-                                                "You've received a scheduled payment!\n\n"
-                                                f"💰 **Amount Received**\n{payment_amount:,} points\n\n"
-                                                f"📊 **Schedule Progress**\n{progress_bar} {progress:.1f}%\n"
-                                                f"({schedule.points_paid}/{schedule.total_points} points)\n\n"
-                                                f"⏰ **Payment Details**\n"
-                                                f"• Frequency: Every {schedule.interval_value} {schedule.interval_type.value}\n"
-                                                f"• Schedule ID: #{schedule.id}\n\n"
-                                                f"👤 Individual Payment • Automated Payment"
-                                            )
-                                        )
-                                        embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
-                                        await user.send(embed=embed)
-                                    except Exception as e:
-                                        print(f"Failed to send DM to {member.user_id}: {e}")
-
-                                    session.commit()
-
-                            except Exception as e:
-                                print(f"Failed to process payment for {member.user_id}: {e}")
-                                session.rollback()
-                                continue
-
-                # Small sleep between iterations to prevent CPU overload
-                await asyncio.sleep(0.1)
+    @app_commands.guild_only()
+    @app_commands.command(
+        name="history",
+        description="View payout history"
+    )
+    @app_commands.describe(
+        user="Show payouts received by this user (administrators only)",
+        schedule_id="Only show payouts from this schedule"
+    )
+    async def history(
+        self,
+        interaction: discord.Interaction,
+        user: Optional[discord.Member] = None,
+        schedule_id: Optional[int] = None
+    ):
+        await interaction.response.defer(ephemeral=True)
 
-            except Exception as e:
-                print(f"Error in payment processing: {e}")
+        permissions = getattr(interaction.user, "guild_permissions", None)
+        is_admin = permissions is not None and permissions.administrator
+        if user is not None and user.id != interaction.user.id and not is_admin:
+            await interaction.followup.send(
+                embed=create_error_embed(
+                    title="Permission Denied",
+                    description="Only administrators can view another user's payout history."
+                ),
+                ephemeral=True
+            )
+            return
+
+        user_id = (user or interaction.user).id
+        if schedule_id is not None:
+            session = self.bot.db_manager.Session()
+            try:
+                schedule = find_schedule(session, schedule_id, interaction.guild_id)
+                can_view_schedule = schedule is not None and (
+                    is_admin or schedule.created_by == interaction.user.id or (
+                        schedule.organization_id is not None and session.query(Organization)
+                        .filter_by(id=schedule.organization_id, owner_id=interaction.user.id)
+                        .count() > 0
+                    )
+                )
             finally:
-                if session:
-                    session.close()
+                session.close()
 
+            if schedule is None:
+                await interaction.followup.send(
+                    embed=create_error_embed(
+                        title="Schedule Not Found",
+                        description=f"Schedule #{schedule_id} not found!"
+                    ),
+                    ephemeral=True
+                )
+                return
+
+            # Schedule owners see every recipient, others only their own payouts
+            if can_view_schedule and user is None:
+                user_id = None
+
+        view = HistoryView(
+            self.bot,
+            interaction.user.id,
+            interaction.guild_id,
+            user_id=user_id,
+            schedule_id=schedule_id
+        )
+        embed = view.load_page()
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+
+    @app_commands.guild_only()
+    @app_commands.command(name="job", description="Check the progress of a background job")
+    @app_commands.describe(job_id="ID of the job")
+    async def job_status(self, interaction: discord.Interaction, job_id: int):
+        await interaction.response.defer(ephemeral=True)
+
+        job = await asyncio.to_thread(self.bot.job_runner.get_job, job_id)
+        permissions = getattr(interaction.user, "guild_permissions", None)
+        is_admin = permissions is not None and permissions.administrator
+        if job is None or job.guild_id != interaction.guild_id or (
+            job.created_by != interaction.user.id and not is_admin
+        ):
+            await interaction.followup.send(
+                embed=create_error_embed(title="Job Not Found", description=f"Job #{job_id} not found!"),
+                ephemeral=True
+            )
+            return
+
+        await interaction.followup.send(embed=self.bot.job_runner.render(job), ephemeral=True)
+
+    @app_commands.guild_only()
     @app_commands.command(
         name="pay",
         description="Create an automated payment schedule for a user"
@@ -439,8 +496,10 @@ class Menu(commands.Cog):
         amount="Amount of points per payment",
         interval_value="How often to make payments (e.g., 24)",
         interval_type="Time unit for interval (s/m/h/d/mm)",
-        total_points="Total points to distribute over time"
+        total_points="Total points to distribute over time",
+        spread="Optional window, in interval units, to stagger payouts across so bulk schedules don't all pay at once"
     )
+    @token_bucket("pay", user=(3, 60), guild=(30, 60))
     async def pay_user(
         self,
         interaction: discord.Interaction,
@@ -448,7 +507,8 @@ class Menu(commands.Cog):
         amount: int,
         interval_value: int,
         interval_type: str,
-        total_points: int
+        total_points: int,
+        spread: Optional[int] = None
     ):
         # Defer the response since this might take a while
         await interaction.response.defer(ephemeral=True)
@@ -507,17 +567,29 @@ class Menu(commands.Cog):
             )
             return
 
+        if spread is not None and not 0 <= spread <= interval_value:
+            await interaction.followup.send(
+                embed=create_error_embed(
+                    title="Invalid Spread",
+                    description="Spread must be between 0 and the interval value!"
+                ),
+                ephemeral=True
+            )
+            return
+
         session = self.bot.db_manager.Session()
         try:
             # Create payment schedule
             schedule = PaymentSchedule(
+                guild_id=interaction.guild_id,
                 amount=amount,
                 interval_type=interval_type,
                 interval_value=interval_value,
                 total_points=total_points,
                 points_paid=0,
-                created_by=str(interaction.user.id),
-                last_paid_at=datetime.utcnow()
+                created_by=interaction.user.id,
+                last_paid_at=datetime.utcnow(),
+                spread_seconds=spread * interval_type.to_seconds() if spread else None
             )
             session.add(schedule)
             session.flush()  # Get the schedule ID
@@ -525,7 +597,7 @@ class Menu(commands.Cog):
             # Add schedule member
             schedule_member = PaymentScheduleMember(
                 schedule_id=schedule.id,
-                user_id=str(user.id)
+                user_id=user.id
             )
             session.add(schedule_member)
 
@@ -549,9 +621,15 @@ class Menu(commands.Cog):
 
             # Make initial payment
             try:
-                success = await self.bot.points_manager.add_points(user.id, amount)
+                success = await self.bot.points_clients.for_guild(interaction.guild_id).add_points(user.id, amount)
                 if success:
                     schedule.points_paid += amount
+                    record_payouts(session, [{
+                        "schedule_id": schedule.id,
+                        "guild_id": schedule.guild_id,
+                        "user_id": schedule_member.user_id,
+                        "amount": amount
+                    }])
                     
                     # Send DM notification to recipient
                     try:
@@ -570,10 +648,16 @@ class Menu(commands.Cog):
                         )
                         await user.send(embed=recipient_embed)
                     except Exception as e:
-                        print(f"Failed to send DM to recipient: {e}")
+                        self.bot.logger.warning(
+                            "Failed to send schedule DM",
+                            extra={"schedule_id": schedule.id, "user_id": schedule_member.user_id, "error": str(e)}
+                        )
 
             except Exception as e:
-                print(f"Failed to make initial payment: {e}")
+                self.bot.logger.error(
+                    "Failed to make initial payment",
+                    extra={"schedule_id": schedule.id, "user_id": user.id, "error": str(e)}
+                )
 
             session.commit()
 
@@ -594,7 +678,7 @@ class Menu(commands.Cog):
                     f"• Amount: {amount:,} points"
                 )
             )
-            embed.set_footer(text="☁ Celeris runs securely on Mallard Cloud")
+            embed.set_footer(text=FOOTER_TEXT)
             await interaction.followup.send(embed=embed, ephemeral=True)
 
         except Exception as e:
@@ -1,13 +1,26 @@
 from discord.ext import commands
 import discord
 from discord import app_commands
-from helpers.embed_helpers import create_basic_embed, create_error_embed, create_success_embed
+from helpers.embed_helpers import (
+    create_basic_embed,
+    create_error_embed,
+    create_success_embed,
+    calculate_schedule_progress
+)
+from helpers.embed_templates import get_embed
 from typing import Optional, List
-from sqlalchemy import select, or_
-from models.database import Organization, OrganizationMember, PaymentSchedule, IntervalType, PaymentScheduleMember
+from sqlalchemy import select, or_, insert, delete, update
+from models.database import (
+    Organization, OrganizationMember, PaymentSchedule, IntervalType, PaymentScheduleMember, Payout, JobStatus
+)
+from helpers.schedule_archive import find_schedule
+from helpers.payout_ledger import record_payouts
+from helpers.tracing import TracedView
+from helpers.JobRunner import JobHandler
+from helpers.cooldowns import token_bucket
 from datetime import datetime
 
-class ConfirmationView(discord.ui.View):
+class ConfirmationView(TracedView):
     def __init__(self):
         super().__init__(timeout=60.0)
         self.value = None
@@ -30,29 +43,107 @@ class ConfirmationView(discord.ui.View):
 
     @discord.ui.button(label="Back", style=discord.ButtonStyle.danger, emoji="🏠")
     async def back_to_main(self, interaction: discord.Interaction, button: discord.ui.Button):
-        embed = create_basic_embed(
-            title="Welcome to Celeris",
+        menu = interaction.client.get_cog("Menu")
+        await interaction.response.edit_message(
+            embed=get_embed("welcome"),
+            view=menu.views.main if menu else None
+        )
+
+class PayOrgJob(JobHandler):
+    """Initial payment of a pay_org schedule, fanned out over the organization's members"""
+    kind = "pay_org"
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def load_items(self, session, job, payload) -> List[int]:
+        # Members of the schedule this job hasn't paid yet
+        paid = select(Payout.user_id).where(Payout.job_id == job.id)
+        return [
+            user_id for (user_id,) in session.query(PaymentScheduleMember.user_id).filter(
+                PaymentScheduleMember.schedule_id == payload["schedule_id"],
+                PaymentScheduleMember.user_id.not_in(paid)
+            )
+        ]
+
+    async def process(self, job, payload, user_id: int) -> int:
+        result = await self.bot.points_clients.for_guild(job.guild_id).add_points(
+            user_id=user_id,
+            amount=payload["points_per_member"]
+        )
+        if not result:
+            raise ValueError(f"Points API rejected payment: {result.message}")
+        return payload["points_per_member"]
+
+    def record(self, session, job, payload, user_id: int, amount: int) -> None:
+        paid_at = datetime.utcnow()
+        session.execute(
+            update(PaymentSchedule)
+            .where(PaymentSchedule.id == payload["schedule_id"])
+            .values(points_paid=PaymentSchedule.points_paid + amount, last_paid_at=paid_at)
+        )
+        record_payouts(session, [{
+            "schedule_id": payload["schedule_id"],
+            "guild_id": job.guild_id,
+            "organization_id": payload["organization_id"],
+            "user_id": user_id,
+            "amount": amount,
+            "paid_at": paid_at,
+            "job_id": job.id
+        }])
+
+    async def notify(self, job, payload, user_id: int, amount: int) -> None:
+        user = await self.bot.fetch_user(user_id)
+        progress, progress_bar = calculate_schedule_progress(amount, payload["total_points"])
+        await user.send(embed=get_embed(
+            "organization_payment_received",
+            amount=amount,
+            progress_bar=progress_bar,
+            progress=progress,
+            points_paid=amount,
+            total_points=payload["total_points"],
+            interval_value=payload["interval_value"],
+            interval_type=payload["interval_type"],
+            organization=payload["organization_name"],
+            schedule_id=payload["schedule_id"]
+        ))
+
+    def render(self, job, payload) -> discord.Embed:
+        done = job.completed_items + job.failed_items
+        if job.status == JobStatus.FAILED:
+            status = f"❌ Failed: {job.error}"
+        elif job.status == JobStatus.COMPLETED:
+            status = "✅ Complete"
+        else:
+            _, progress_bar = calculate_schedule_progress(done, job.total_items or 1)
+            status = f"⏳ In progress {progress_bar} {done}/{job.total_items}"
+
+        return create_success_embed(
+            title="Payment Schedule Created",
             description=(
-                "### Get Started\n"
-                "Create and manage organizations, automate payments, and more!\n\n"
-                "**🔑 Key Features**\n"
-                "• Create organizations\n"
-                "• Set up automated payments\n"
-                "• Manage members and roles\n"
-                "• Track payment history\n\n"
-                "**💡 Quick Start**\n"
-                "Click 'Create Organization' to begin!"
+                f"Created organization payment schedule!\n\n"
+                "**📊 Schedule Details**\n"
+                f"• Amount per payment: {payload['amount']:,} points\n"
+                f"• Interval: Every {payload['interval_value']} {payload['interval_type']}\n"
+                f"• Members: {job.total_items}\n"
+                f"• Points per member: {payload['points_per_member']:,}\n"
+                f"• Total points: {payload['total_points']:,}\n"
+                f"• Schedule ID: #{payload['schedule_id']}\n\n"
+                "**💰 Initial Payment**\n"
+                f"• Job ID: #{job.id}\n"
+                f"• Status: {status}\n"
+                f"• Successful distributions: {job.completed_items}/{job.total_items}\n"
+                f"• Points distributed: {job.completed_items * payload['points_per_member']:,}"
             )
         )
-        embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
-        view = StartView()
-        await interaction.response.edit_message(embed=embed, view=view)
 
 class Organizations(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db_manager
+        bot.job_runner.register(PayOrgJob(bot))
 
+    @app_commands.guild_only()
     @app_commands.command(
         name="add_to_org",
         description="Add a user to an organization (Owner only)"
@@ -70,7 +161,10 @@ class Organizations(commands.Cog):
         session = self.bot.db_manager.Session()
         try:
             # Check if org exists and user is owner
-            org = session.query(Organization).filter_by(name=organization_name).first()
+            org = session.query(Organization).filter_by(
+                guild_id=interaction.guild_id,
+                name=organization_name
+            ).first()
             if not org:
                 await interaction.response.send_message(
                     embed=create_error_embed(
@@ -82,7 +176,7 @@ class Organizations(commands.Cog):
                 return
 
             # Verify the command user is the owner
-            if str(interaction.user.id) != org.owner_id:
+            if interaction.user.id != org.owner_id:
                 await interaction.response.send_message(
                     embed=create_error_embed(
                         title="Permission Denied",
@@ -95,7 +189,7 @@ class Organizations(commands.Cog):
             # Check if user is already a member
             existing_member = session.query(OrganizationMember).filter_by(
                 organization_id=org.id,
-                user_id=str(user.id)
+                user_id=user.id
             ).first()
             
             if existing_member:
@@ -111,10 +205,11 @@ class Organizations(commands.Cog):
             # Add the new member
             new_member = OrganizationMember(
                 organization_id=org.id,
-                user_id=str(user.id)
+                user_id=user.id
             )
             session.add(new_member)
             session.commit()
+            self.bot.org_index.add_member(org.id, new_member.user_id)
 
             # Send success message
             embed = create_success_embed(
@@ -141,6 +236,7 @@ class Organizations(commands.Cog):
         finally:
             session.close()
 
+    @app_commands.guild_only()
     @app_commands.command(
         name="remove_from_org",
         description="Remove a user from an organization"
@@ -160,42 +256,36 @@ class Organizations(commands.Cog):
         session = self.bot.db_manager.Session()
         try:
             # Find the organization
-            org = session.query(Organization).filter_by(name=organization_name).first()
+            org = session.query(Organization).filter_by(
+                guild_id=interaction.guild_id,
+                name=organization_name
+            ).first()
             if not org:
                 raise ValueError(f"Organization '{organization_name}' not found!")
 
             # Check if user is the owner
-            if str(interaction.user.id) != org.owner_id:
+            if interaction.user.id != org.owner_id:
                 raise ValueError("Only the organization owner can remove members!")
 
             # Find the member
             member = session.query(OrganizationMember).filter_by(
                 organization_id=org.id,
-                user_id=str(user.id)
+                user_id=user.id
             ).first()
             
             if not member:
                 raise ValueError(f"{user.name} is not a member of {organization_name}!")
 
             # Remove member from active payment schedules
-            active_schedules = session.query(PaymentSchedule).filter_by(
-                organization_id=org.id
-            ).all()
-            
-            removed_from_schedules = 0
-            for schedule in active_schedules:
-                schedule_member = session.query(PaymentScheduleMember).filter_by(
-                    schedule_id=schedule.id,
-                    user_id=str(user.id)
-                ).first()
-                if schedule_member:
-                    session.delete(schedule_member)
-                    removed_from_schedules += 1
+            removed_from_schedules = await self.remove_member_from_schedules(
+                session, org.id, user.id
+            )
 
             # Remove the member from the organization
             joined_at = member.joined_at  # Store for the success message
             session.delete(member)
             session.commit()
+            self.bot.org_index.remove_member(org.id, user.id)
 
             embed = create_success_embed(
                 title="Member Removed",
@@ -223,6 +313,7 @@ class Organizations(commands.Cog):
         finally:
             session.close()
 
+    @app_commands.guild_only()
     @app_commands.command(
         name="cancel_schedule",
         description="Cancel an existing payment schedule"
@@ -239,20 +330,22 @@ class Organizations(commands.Cog):
         
         session = self.bot.db_manager.Session()
         try:
-            # Find the schedule
-            schedule = session.query(PaymentSchedule).filter_by(id=schedule_id).first()
+            # Find the schedule, finished ones may already have been archived
+            schedule = find_schedule(session, schedule_id, interaction.guild_id)
             if not schedule:
                 raise ValueError(f"Schedule #{schedule_id} not found!")
+            if not isinstance(schedule, PaymentSchedule) or schedule.cancelled_at:
+                raise ValueError(f"Schedule #{schedule_id} has already finished or been cancelled!")
 
             # Check permissions
             if schedule.organization_id:
                 # Organization schedule
                 org = session.query(Organization).filter_by(id=schedule.organization_id).first()
-                if str(interaction.user.id) != org.owner_id:
+                if interaction.user.id != org.owner_id:
                     raise ValueError("Only the organization owner can cancel this schedule!")
             else:
                 # Individual schedule
-                if str(interaction.user.id) != schedule.created_by:
+                if interaction.user.id != schedule.created_by:
                     raise ValueError("Only the schedule creator can cancel this schedule!")
 
             # Create confirmation view
@@ -268,7 +361,7 @@ class Organizations(commands.Cog):
                     "**⚠️ Warning**\n"
                     "• This action cannot be undone\n"
                     "• Remaining points will not be distributed\n"
-                    "• All schedule data will be deleted"
+                    "• The schedule will be moved to payment history"
                 )
             )
             
@@ -278,17 +371,12 @@ class Organizations(commands.Cog):
             await confirm_view.wait()
             
             if confirm_view.value:
-                # Remove schedule members first
-                session.query(PaymentScheduleMember).filter_by(
-                    schedule_id=schedule.id
-                ).delete()
-
                 # Store info for success message
                 points_remaining = schedule.total_points - schedule.points_paid
                 duration = discord.utils.format_dt(schedule.created_at, style='R')
 
-                # Remove the schedule
-                session.delete(schedule)
+                # Stop payouts; the compaction job moves it to the archive tables
+                schedule.cancelled_at = datetime.utcnow()
                 session.commit()
 
                 success_embed = create_success_embed(
@@ -325,6 +413,7 @@ class Organizations(commands.Cog):
         finally:
             session.close()
 
+    @app_commands.guild_only()
     @app_commands.command(
         name="transfer_org_ownership",
         description="Transfer ownership of an organization to another user"
@@ -344,29 +433,33 @@ class Organizations(commands.Cog):
         session = self.bot.db_manager.Session()
         try:
             # Find the organization
-            org = session.query(Organization).filter_by(name=organization_name).first()
+            org = session.query(Organization).filter_by(
+                guild_id=interaction.guild_id,
+                name=organization_name
+            ).first()
             if not org:
                 raise ValueError(f"Organization '{organization_name}' not found!")
 
             # Check if user is the current owner
-            if str(interaction.user.id) != org.owner_id:
+            if interaction.user.id != org.owner_id:
                 raise ValueError("Only the organization owner can transfer ownership!")
 
             # Check if new owner is already a member
             member = session.query(OrganizationMember).filter_by(
                 organization_id=org.id,
-                user_id=str(new_owner.id)
+                user_id=new_owner.id
             ).first()
             
             if not member:
                 raise ValueError(f"{new_owner.name} must be a member of the organization first!")
 
             # Store old owner info for message
-            old_owner = await self.bot.fetch_user(int(org.owner_id))
+            old_owner = await self.bot.fetch_user(org.owner_id)
 
             # Update ownership
-            org.owner_id = str(new_owner.id)
+            org.owner_id = new_owner.id
             session.commit()
+            self.bot.org_index.set_owner(org.id, org.owner_id)
 
             embed = create_success_embed(
                 title="Ownership Transferred",
@@ -388,6 +481,7 @@ class Organizations(commands.Cog):
         finally:
             session.close()
 
+    @app_commands.guild_only()
     @app_commands.command(
         name="pay_org",
         description="Create an automated payment schedule for an organization"
@@ -399,6 +493,7 @@ class Organizations(commands.Cog):
         interval_type="Time unit for interval (s/m/h/d/mm)",
         total_points="Total points to distribute over time"
     )
+    @token_bucket("pay_org", user=(2, 300), guild=(10, 300))
     async def pay_org(
         self,
         interaction: discord.Interaction,
@@ -425,7 +520,10 @@ class Organizations(commands.Cog):
             session = self.bot.db_manager.Session()
             try:
                 # Get organization
-                org = session.query(Organization).filter_by(name=organization_name).first()
+                org = session.query(Organization).filter_by(
+                    guild_id=interaction.guild_id,
+                    name=organization_name
+                ).first()
                 if not org:
                     raise ValueError(f"Organization '{organization_name}' not found!")
 
@@ -436,94 +534,49 @@ class Organizations(commands.Cog):
 
                 # Create payment schedule
                 schedule = PaymentSchedule(
+                    guild_id=interaction.guild_id,
                     organization_id=org.id,
                     amount=amount,
                     interval_type=IntervalType(interval_type.lower()),
                     interval_value=interval_value,
                     total_points=total_points,
                     points_paid=0,
-                    created_by=str(interaction.user.id),
+                    created_by=interaction.user.id,
                     last_paid_at=datetime.utcnow()
                 )
                 session.add(schedule)
                 session.flush()
 
-                # Add members to schedule
-                for member in members:
-                    schedule_member = PaymentScheduleMember(
-                        schedule_id=schedule.id,
-                        user_id=member.user_id
-                    )
-                    session.add(schedule_member)
-
-                # Calculate how many payments are needed
-                number_of_payments = total_points // amount
-                if total_points % amount != 0:
-                    number_of_payments += 1  # Add one more payment if there's a remainder
-
-                # Calculate points per member for initial payment
-                points_per_member = amount // len(members)
-                successful_distributions = 0
-
-                # Make initial payment
-                for member in members:
-                    try:
-                        await self.bot.points_manager.add_points(
-                            user_id=int(member.user_id),
-                            amount=points_per_member
-                        )
-                        successful_distributions += 1
-
-                        # Send DM notification
-                        user = await self.bot.fetch_user(int(member.user_id))
-                        progress_percentage = (points_per_member / total_points) * 100
-                        filled_blocks = int((progress_percentage / 100) * 10)
-                        empty_blocks = 10 - filled_blocks
-                        progress_bar = '█' * filled_blocks + '░' * empty_blocks
-
-                        dm_embed = create_success_embed(
-                            title="Payment Received",
-                            description=(
-                                "**Organization Payment**\n"
-                                "You've received a scheduled payment!\n\n"
-                                f"💰 **Amount Received**\n{points_per_member:,} points\n\n"
-                                f"📊 **Schedule Progress**\n{progress_bar} {progress_percentage:.1f}%\n"
-                                f"({schedule.points_paid + points_per_member}/{schedule.total_points} points)\n\n"
-                                f"⏰ **Payment Details**\n"
-                                f"• Frequency: Every {interval_value} {interval_type}\n"
-                                f"• Organization: {org.name}\n"
-                                f"• Schedule ID: #{schedule.id}\n\n"
-                                f"👥 Organization Payment • Automated Payment"
-                            )
-                        )
-                        await user.send(embed=dm_embed)
-
-                    except Exception as e:
-                        print(f"Error distributing points to {member.user_id}: {e}")
-
-                if successful_distributions > 0:
-                    schedule.points_paid += points_per_member * successful_distributions
-                    schedule.last_paid_at = datetime.utcnow()
-                    session.commit()
-
-                # Send success message
-                embed = create_success_embed(
-                    title="Payment Schedule Created",
-                    description=(
-                        f"Created organization payment schedule!\n\n"
-                        "**📊 Schedule Details**\n"
-                        f"• Amount per payment: {amount:,} points\n"
-                        f"• Interval: Every {interval_value} {interval_type}\n"
-                        f"• Members: {len(members)}\n"
-                        f"• Points per member: {points_per_member:,}\n"
-                        f"• Total points: {total_points:,}\n"
-                        f"• Schedule ID: #{schedule.id}\n\n"
-                        "**💰 Initial Payment**\n"
-                        f"• Successful distributions: {successful_distributions}/{len(members)}\n"
-                        f"• Points distributed: {schedule.points_paid:,}"
-                    )
+                # Add members to schedule in a single executemany insert
+                session.execute(
+                    insert(PaymentScheduleMember),
+                    [
+                        {"schedule_id": schedule.id, "user_id": member.user_id}
+                        for member in members
+                    ]
                 )
-                await interaction.followup.send(embed=embed, ephemeral=True)
+
+                # The initial payment runs as a background job so large
+                # organizations don't hold the interaction open
+                job = self.bot.job_runner.create(
+                    session,
+                    PayOrgJob.kind,
+                    {
+                        "schedule_id": schedule.id,
+                        "organization_id": org.id,
+                        "organization_name": org.name,
+                        "amount": amount,
+                        "points_per_member": amount // len(members),
+                        "interval_value": interval_value,
+                        "interval_type": interval_type,
+                        "total_points": total_points
+                    },
+                    created_by=interaction.user.id,
+                    guild_id=interaction.guild_id,
+                    total_items=len(members)
+                )
+                session.commit()
+                job_id = job.id
 
             except Exception as e:
                 session.rollback()
@@ -531,24 +584,61 @@ class Organizations(commands.Cog):
             finally:
                 session.close()
 
+            # Acknowledges with the job ID, then distributes in the background
+            await self.bot.job_runner.start(job_id, interaction)
+
         except ValueError as e:
             await interaction.followup.send(
                 embed=create_error_embed(title="Invalid Input", description=str(e)),
                 ephemeral=True
             )
 
-    async def remove_member_from_schedules(self, session, org_id: int, user_id: str):
-        """Remove a member from all active payment schedules in an organization"""
-        schedules = session.query(PaymentSchedule)\
-            .filter_by(organization_id=org_id)\
-            .all()
-        
-        for schedule in schedules:
-            session.query(PaymentScheduleMember)\
-                .filter_by(
-                    schedule_id=schedule.id,
-                    user_id=user_id
-                ).delete()
+    async def _organization_choices(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+        owned_only: bool
+    ) -> List[app_commands.Choice[str]]:
+        names = self.bot.org_index.suggest(
+            interaction.guild_id,
+            interaction.user.id,
+            current,
+            owned_only=owned_only
+        )
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
+    @add_to_org.autocomplete("organization_name")
+    @remove_from_org.autocomplete("organization_name")
+    @transfer_org_ownership.autocomplete("organization_name")
+    async def owned_organization_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str
+    ) -> List[app_commands.Choice[str]]:
+        return await self._organization_choices(interaction, current, owned_only=True)
+
+    @pay_org.autocomplete("organization_name")
+    async def organization_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str
+    ) -> List[app_commands.Choice[str]]:
+        return await self._organization_choices(interaction, current, owned_only=False)
+
+    async def remove_member_from_schedules(self, session, org_id: int, user_id: int) -> int:
+        """Remove a member from all payment schedules in an organization with a single DELETE"""
+        org_schedule_ids = select(PaymentSchedule.id)\
+            .where(PaymentSchedule.organization_id == org_id)
+
+        result = session.execute(
+            delete(PaymentScheduleMember)
+            .where(
+                PaymentScheduleMember.user_id == user_id,
+                PaymentScheduleMember.schedule_id.in_(org_schedule_ids)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
 async def setup(bot):
     await bot.add_cog(Organizations(bot))
\ No newline at end of file
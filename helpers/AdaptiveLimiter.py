@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed call latency and errors.
+
+    Every call that succeeds within ``latency_target`` grows the limit by
+    ``1 / limit``, so about one more slot per limit's worth of good calls.
+    An error or a call slower than the target multiplies the limit by
+    ``backoff``, at most once per ``latency_target`` so one slow burst
+    doesn't collapse it to the minimum.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target: float = 1.0,
+        backoff: float = 0.5
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: float, ok: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if ok and latency <= self.latency_target:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.latency_target:
+                    self._last_decrease = now
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._condition.notify_all()
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Run ``await func(*args, **kwargs)`` within the limit.
+
+        A raised exception or a falsy result counts as an error.
+        """
+        await self.acquire()
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await func(*args, **kwargs)
+            ok = bool(result)
+            return result
+        finally:
+            await self.release(time.perf_counter() - start, ok)
@@ -0,0 +1,59 @@
+import io
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import discord
+
+
+class AssetCache:
+    """
+    Keeps an image in memory and remembers its Discord CDN URL once uploaded.
+
+    The first response has to attach the file; after that embeds can point
+    at the CDN copy and skip the multipart upload. Discord attachment URLs
+    are signed and expire (the ``ex`` query parameter), so the URL is
+    dropped shortly before it runs out and the next response re-uploads.
+    """
+
+    # Stop reusing a URL this many seconds before Discord expires it
+    EXPIRY_MARGIN = 3600
+    # Fallback lifetime for URLs without an expiry parameter
+    DEFAULT_TTL = 12 * 3600
+
+    def __init__(self, path: str, filename: str):
+        self.filename = filename
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self._url: Optional[str] = None
+        self._url_expires_at = 0.0
+
+    @property
+    def attachment_url(self) -> str:
+        return f"attachment://{self.filename}"
+
+    @property
+    def cdn_url(self) -> Optional[str]:
+        if self._url and time.time() < self._url_expires_at - self.EXPIRY_MARGIN:
+            return self._url
+        return None
+
+    def file(self) -> discord.File:
+        return discord.File(io.BytesIO(self.data), filename=self.filename)
+
+    def remember(self, message: discord.Message) -> None:
+        """Store the CDN URL of the attachment uploaded with ``message``"""
+        for attachment in message.attachments:
+            if attachment.filename == self.filename:
+                self._url = attachment.url
+                self._url_expires_at = self._parse_expiry(attachment.url)
+                return
+
+    def _parse_expiry(self, url: str) -> float:
+        expiry = parse_qs(urlparse(url).query).get("ex")
+        if expiry:
+            try:
+                return float(int(expiry[0], 16))
+            except ValueError:
+                pass
+        return time.time() + self.DEFAULT_TTL
@@ -2,12 +2,16 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from models.database import Base
+from helpers.migrations import run_migrations
+from helpers.tracing import install_database_tracing
 import os
 import logging
 
 # Disable SQLAlchemy logging
 logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
 
+logger = logging.getLogger("discord_bot.database")
+
 class DatabaseManager:
     _instance = None
 
@@ -49,7 +53,11 @@ class DatabaseManager:
             connect_args={'check_same_thread': False} if self.db_url.startswith('sqlite') else {}
         )
         
+        # Attribute statement time to whichever command is being traced
+        install_database_tracing(self.engine)
+
         Base.metadata.create_all(self.engine)
+        run_migrations(self.engine)
         self.Session = sessionmaker(bind=self.engine)
 
         # Verify write permissions by testing a simple write
@@ -58,7 +66,7 @@ class DatabaseManager:
             session.execute(text("SELECT 1"))
             session.commit()
         except Exception as e:
-            print(f"Database write test failed: {e}")
+            logger.error("Database write test failed", extra={"error": str(e)})
             raise
         finally:
             session.close()
@@ -0,0 +1,364 @@
+import abc
+import asyncio
+from datetime import datetime
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import discord
+from sqlalchemy import update
+
+from models.database import Job, JobStatus
+
+
+class JobHandler(abc.ABC):
+    """
+    One kind of background job.
+
+    A job is a persisted payload plus a list of items the runner fans out over.
+    ``load_items`` must return only the items that still need processing, based
+    on what ``record`` has persisted, so a job interrupted by a restart resumes
+    without redoing finished items.
+    """
+
+    kind: str = None
+
+    @abc.abstractmethod
+    def load_items(self, session, job: Job, payload: dict) -> List[Any]:
+        """Items still to process, read in the job's ``_begin`` transaction."""
+
+    @abc.abstractmethod
+    async def process(self, job: Job, payload: dict, item: Any) -> Any:
+        """Do the work for one item; raise to count it as failed."""
+
+    def record(self, session, job: Job, payload: dict, item: Any, result: Any) -> None:
+        """Persist a successful item; committed together with the job's counters."""
+
+    async def notify(self, job: Job, payload: dict, item: Any, result: Any) -> None:
+        """Side effects after an item is recorded, such as a DM to the recipient."""
+
+    @abc.abstractmethod
+    def render(self, job: Job, payload: dict) -> discord.Embed:
+        """Progress or result embed for the job."""
+
+
+class JobRunner:
+    """
+    Runs registered job kinds in the background with bounded concurrency.
+
+    Commands create the job row in their own transaction and call ``start``,
+    which acknowledges the interaction with the job's first progress embed
+    and returns immediately. Progress edits to that response are throttled to
+    one per ``progress_interval`` seconds. Once the interaction token has
+    expired, or for jobs resumed after a restart, the final result is sent to
+    the job's creator by DM instead.
+
+    On shutdown jobs stop taking new items and items already started get up
+    to ``shutdown_timeout`` seconds to finish and be recorded, so a payment
+    DRIP has applied isn't paid again when the job resumes.
+
+    An item whose ``process`` succeeded but whose ``record`` keeps failing
+    (e.g. while SQLite is locked) is not a failed item: its side effect has
+    happened. It is held in memory and its record retried with backoff; the
+    job doesn't finish until every held item is written.
+    """
+
+    RECORD_ATTEMPTS = 5  # tries to record an item before holding it
+    RECORD_BACKOFF = 0.1  # seconds before the first retry, doubled each time
+    MAX_RECORD_BACKOFF = 30.0
+
+    def __init__(self, bot, concurrency: int = 8, progress_interval: float = 2.0, shutdown_timeout: float = 30.0):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.shutdown_timeout = shutdown_timeout
+        self._closing = False
+        self._closed = asyncio.Event()
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._last_report: Dict[int, float] = {}
+
+    def register(self, handler: JobHandler) -> None:
+        if not isinstance(handler, JobHandler):
+            raise TypeError(f"{type(handler).__name__} is not a JobHandler")
+        if not handler.kind:
+            raise ValueError(f"{type(handler).__name__} has no job kind")
+        self._handlers[handler.kind] = handler
+
+    def create(
+        self,
+        session,
+        kind: str,
+        payload: dict,
+        created_by: int,
+        guild_id: Optional[int] = None,
+        total_items: int = 0
+    ) -> Job:
+        """Add a pending job to ``session``; the caller commits, then calls ``start``."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = Job(
+            kind=kind,
+            guild_id=guild_id,
+            created_by=created_by,
+            status=JobStatus.PENDING,
+            payload=json.dumps(payload),
+            total_items=total_items
+        )
+        session.add(job)
+        session.flush()
+        return job
+
+    async def start(self, job_id: int, interaction: Optional[discord.Interaction] = None) -> None:
+        job = await asyncio.to_thread(self._load_job, job_id)
+        if interaction is not None:
+            handler = self._handlers[job.kind]
+            await interaction.followup.send(embed=handler.render(job, json.loads(job.payload)), ephemeral=True)
+        self._tasks[job_id] = asyncio.create_task(self._run(job, interaction))
+        self._tasks[job_id].add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def resume(self) -> int:
+        """Restart jobs left pending or running by a previous process."""
+        jobs = await asyncio.to_thread(self._unfinished_jobs)
+        for job in jobs:
+            if job.kind in self._handlers and job.id not in self._tasks and self._owns(job.guild_id):
+                await self.start(job.id)
+        return len(self._tasks)
+
+    async def close(self) -> None:
+        """
+        Stop running jobs after their in-flight items; they stay unfinished in
+        the database and resume on the next start.
+        """
+        self._closing = True
+        self._closed.set()
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+        if pending:
+            self.bot.logger.warning(
+                "Cancelling background jobs still running at shutdown", extra={"jobs": len(pending)}
+            )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        session = self.bot.db_manager.Session()
+        try:
+            job = session.get(Job, job_id)
+            if job is not None:
+                session.expunge(job)
+            return job
+        finally:
+            session.close()
+
+    def render(self, job: Job) -> discord.Embed:
+        return self._handlers[job.kind].render(job, json.loads(job.payload))
+
+    def _owns(self, guild_id: Optional[int]) -> bool:
+        # With several shard processes, a guild's jobs resume on the process running its shard
+        if guild_id is None or self.bot.shard_ids is None or not self.bot.shard_count:
+            return True
+        return (guild_id >> 22) % self.bot.shard_count in self.bot.shard_ids
+
+    def _load_job(self, job_id: int) -> Job:
+        job = self.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Job #{job_id} not found!")
+        return job
+
+    def _unfinished_jobs(self) -> List[Job]:
+        session = self.bot.db_manager.Session()
+        try:
+            jobs = session.query(Job).filter(
+                Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+            ).order_by(Job.id).all()
+            session.expunge_all()
+            return jobs
+        finally:
+            session.close()
+
+    def _begin(self, job: Job, payload: dict) -> List[Any]:
+        session = self.bot.db_manager.Session()
+        try:
+            items = self._handlers[job.kind].load_items(session, job, payload)
+            # Items whose process() failed are retried when a job resumes, so
+            # start their count over
+            session.execute(
+                update(Job).where(Job.id == job.id).values(status=JobStatus.RUNNING, failed_items=0)
+            )
+            session.commit()
+            return items
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _record(self, job: Job, payload: dict, item: Any, result: Any) -> None:
+        session = self.bot.db_manager.Session()
+        try:
+            self._handlers[job.kind].record(session, job, payload, item, result)
+            session.execute(
+                update(Job).where(Job.id == job.id).values(completed_items=Job.completed_items + 1)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _finish(self, job: Job, status: JobStatus, error: Optional[str] = None) -> None:
+        session = self.bot.db_manager.Session()
+        try:
+            session.execute(
+                update(Job).where(Job.id == job.id).values(
+                    status=status,
+                    failed_items=job.failed_items,
+                    error=error,
+                    finished_at=datetime.utcnow()
+                )
+            )
+            session.commit()
+        finally:
+            session.close()
+
+    async def _record_with_retry(self, job: Job, payload: dict, item: Any, result: Any) -> bool:
+        delay = self.RECORD_BACKOFF
+        for attempt in range(1, self.RECORD_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._record, job, payload, item, result)
+                return True
+            except Exception as e:
+                self.bot.logger.warning(
+                    "Failed to record job item",
+                    extra={"job_id": job.id, "item": item, "attempt": attempt, "error": str(e)}
+                )
+                if attempt < self.RECORD_ATTEMPTS:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        return False
+
+    async def _process_item(self, handler: JobHandler, job: Job, payload: dict, item: Any) -> tuple:
+        """Process and record one item; returns ``(result, recorded)``. Raises only if ``process`` fails."""
+        result = await handler.process(job, payload, item)
+        return result, await self._record_with_retry(job, payload, item, result)
+
+    async def _item_done(self, handler: JobHandler, job: Job, payload: dict, item: Any, result: Any, interaction) -> None:
+        job.completed_items += 1
+        await self._report_progress(job, payload, interaction)
+        try:
+            await handler.notify(job, payload, item, result)
+        except Exception as e:
+            self.bot.logger.warning(
+                "Job notification failed", extra={"job_id": job.id, "kind": job.kind, "item": item, "error": str(e)}
+            )
+
+    async def _run(self, job: Job, interaction: Optional[discord.Interaction]) -> None:
+        handler = self._handlers[job.kind]
+        payload = json.loads(job.payload)
+        log_extra = {"job_id": job.id, "kind": job.kind}
+
+        try:
+            items = await asyncio.to_thread(self._begin, job, payload)
+            job.status = JobStatus.RUNNING
+            job.failed_items = 0
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in items:
+                queue.put_nowait(item)
+            # (item, result) pairs processed but not yet recorded
+            unrecorded: List[tuple] = []
+
+            async def worker():
+                while not queue.empty() and not self._closing:
+                    item = queue.get_nowait()
+                    try:
+                        # Shielded so a shutdown can't cancel an item between the
+                        # side effect (e.g. DRIP applying a payment) and its record
+                        result, recorded = await asyncio.shield(self._process_item(handler, job, payload, item))
+                    except Exception as e:
+                        job.failed_items += 1
+                        self.bot.logger.error(
+                            "Job item failed", extra={**log_extra, "item": item, "error": str(e)}
+                        )
+                        continue
+                    if not recorded:
+                        unrecorded.append((item, result))
+                        continue
+                    await self._item_done(handler, job, payload, item, result, interaction)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(items)) or 1)))
+
+            delay = self.RECORD_BACKOFF
+            while unrecorded:
+                for item, result in list(unrecorded):
+                    if not await asyncio.shield(self._record_with_retry(job, payload, item, result)):
+                        break
+                    unrecorded.remove((item, result))
+                    await self._item_done(handler, job, payload, item, result, interaction)
+                if not unrecorded:
+                    break
+                if self._closing:
+                    self.bot.logger.critical(
+                        "Job items were applied but not recorded; they will be processed again "
+                        "when the job resumes unless recorded by hand",
+                        extra={**log_extra, "items": [item for item, _ in unrecorded]}
+                    )
+                    self._last_report.pop(job.id, None)
+                    return
+                # Wait out the backoff, waking early for a shutdown
+                try:
+                    await asyncio.wait_for(self._closed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.MAX_RECORD_BACKOFF)
+
+            if self._closing and not queue.empty():
+                # Left running in the database; resume() picks up the rest
+                self._last_report.pop(job.id, None)
+                self.bot.logger.info("Job paused for shutdown", extra={**log_extra, "remaining": queue.qsize()})
+                return
+            job.status = JobStatus.COMPLETED
+            await asyncio.to_thread(self._finish, job, JobStatus.COMPLETED)
+            self.bot.logger.info(
+                "Job completed",
+                extra={**log_extra, "completed": job.completed_items, "failed": job.failed_items}
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            self.bot.logger.exception("Job failed", extra={**log_extra, "error": str(e)})
+            await asyncio.to_thread(self._finish, job, JobStatus.FAILED, str(e))
+
+        self._last_report.pop(job.id, None)
+        await self._report_final(job, handler.render(job, payload), interaction)
+
+    async def _report_progress(self, job: Job, payload: dict, interaction: Optional[discord.Interaction]) -> None:
+        if interaction is None or interaction.is_expired():
+            return
+        now = time.monotonic()
+        if now - self._last_report.get(job.id, 0.0) < self.progress_interval:
+            return
+        self._last_report[job.id] = now
+        try:
+            await interaction.edit_original_response(embed=self._handlers[job.kind].render(job, payload))
+        except discord.HTTPException:
+            pass
+
+    async def _report_final(self, job: Job, embed: discord.Embed, interaction: Optional[discord.Interaction]) -> None:
+        try:
+            if interaction is not None and not interaction.is_expired():
+                await interaction.edit_original_response(embed=embed)
+                return
+            user = await self.bot.fetch_user(job.created_by)
+            await user.send(embed=embed)
+        except discord.HTTPException as e:
+            self.bot.logger.warning(
+                "Failed to report job result", extra={"job_id": job.id, "error": str(e)}
+            )
@@ -0,0 +1,141 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.database import Organization, OrganizationMember
+
+
+class OrganizationIndex:
+    """
+    In-memory prefix index of organization names used for autocomplete.
+
+    Each guild gets its own casefolded, sorted name list so a prefix lookup
+    is a bisect plus a short forward scan instead of a SQL ``LIKE`` over
+    every row. Ownership and membership are mirrored so suggestions can be
+    filtered to the organizations the caller actually has access to.
+    """
+
+    # Above this many orgs per user it's cheaper to walk the guild's index
+    SMALL_SET_THRESHOLD = 256
+
+    def __init__(self):
+        # guild id -> sorted (casefolded name, org id)
+        self._names: Dict[Optional[int], List[Tuple[str, int]]] = {}
+        # org id -> (guild id, name, owner id)
+        self._orgs: Dict[int, Tuple[Optional[int], str, int]] = {}
+        self._members: Dict[int, Set[int]] = {}  # user id -> org ids
+        self._owned: Dict[int, Set[int]] = {}  # user id -> org ids
+
+    def load(self, session) -> None:
+        """Rebuild the index from the database"""
+        self._names.clear()
+        self._orgs.clear()
+        self._members.clear()
+        self._owned.clear()
+
+        for org_id, guild_id, name, owner_id in session.query(
+            Organization.id, Organization.guild_id, Organization.name, Organization.owner_id
+        ):
+            if name is None:
+                continue
+            self._orgs[org_id] = (guild_id, name, owner_id)
+            self._names.setdefault(guild_id, []).append((name.casefold(), org_id))
+            self._owned.setdefault(owner_id, set()).add(org_id)
+        for names in self._names.values():
+            names.sort()
+
+        for org_id, user_id in session.query(
+            OrganizationMember.organization_id, OrganizationMember.user_id
+        ):
+            if org_id in self._orgs:
+                self._members.setdefault(user_id, set()).add(org_id)
+
+    def __len__(self) -> int:
+        return len(self._orgs)
+
+    def add_organization(self, org_id: int, guild_id: Optional[int], name: str, owner_id: int) -> None:
+        if org_id in self._orgs:
+            self.remove_organization(org_id)
+        self._orgs[org_id] = (guild_id, name, owner_id)
+        insort(self._names.setdefault(guild_id, []), (name.casefold(), org_id))
+        self._owned.setdefault(owner_id, set()).add(org_id)
+
+    def remove_organization(self, org_id: int) -> None:
+        entry = self._orgs.pop(org_id, None)
+        if entry is None:
+            return
+        guild_id, name, owner_id = entry
+        names = self._names.get(guild_id, [])
+        key = (name.casefold(), org_id)
+        pos = bisect_left(names, key)
+        if pos < len(names) and names[pos] == key:
+            del names[pos]
+        if not names:
+            self._names.pop(guild_id, None)
+        self._discard(self._owned, owner_id, org_id)
+        for user_id in [u for u, orgs in self._members.items() if org_id in orgs]:
+            self._discard(self._members, user_id, org_id)
+
+    def add_member(self, org_id: int, user_id: int) -> None:
+        if org_id in self._orgs:
+            self._members.setdefault(user_id, set()).add(org_id)
+
+    def remove_member(self, org_id: int, user_id: int) -> None:
+        self._discard(self._members, user_id, org_id)
+
+    def set_owner(self, org_id: int, owner_id: int) -> None:
+        entry = self._orgs.get(org_id)
+        if entry is None:
+            return
+        guild_id, name, old_owner_id = entry
+        self._discard(self._owned, old_owner_id, org_id)
+        self._orgs[org_id] = (guild_id, name, owner_id)
+        self._owned.setdefault(owner_id, set()).add(org_id)
+
+    def suggest(
+        self,
+        guild_id: Optional[int],
+        user_id: int,
+        prefix: str,
+        owned_only: bool = False,
+        limit: int = 25
+    ) -> List[str]:
+        """Return up to ``limit`` org names in ``guild_id`` starting with ``prefix`` visible to ``user_id``"""
+        allowed = set(self._owned.get(user_id, ()))
+        if not owned_only:
+            allowed |= self._members.get(user_id, set())
+        if not allowed:
+            return []
+
+        needle = prefix.casefold()
+
+        # Most users belong to a handful of orgs; filtering those directly
+        # beats walking a long run of matching names owned by other people
+        if len(allowed) <= self.SMALL_SET_THRESHOLD:
+            matches = []
+            for org_id in allowed:
+                org_guild_id, name, _ = self._orgs.get(org_id, (None, None, None))
+                if name is not None and org_guild_id == guild_id and name.casefold().startswith(needle):
+                    matches.append((name.casefold(), name))
+            matches.sort()
+            return [name for _, name in matches[:limit]]
+
+        names = self._names.get(guild_id, [])
+        results = []
+        pos = bisect_left(names, (needle, -1))
+        while pos < len(names) and len(results) < limit:
+            key, org_id = names[pos]
+            if not key.startswith(needle):
+                break
+            if org_id in allowed:
+                results.append(self._orgs[org_id][1])
+            pos += 1
+        return results
+
+    @staticmethod
+    def _discard(mapping: Dict[int, Set[int]], user_id: int, org_id: int) -> None:
+        orgs = mapping.get(user_id)
+        if orgs is None:
+            return
+        orgs.discard(org_id)
+        if not orgs:
+            del mapping[user_id]
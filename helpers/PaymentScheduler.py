@@ -0,0 +1,350 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import update
+
+from helpers.AdaptiveLimiter import AdaptiveLimiter
+from helpers.embed_helpers import calculate_schedule_progress
+from helpers.embed_templates import get_embed
+from helpers.metrics import registry
+from helpers.payout_ledger import record_payouts
+from helpers.schedule_archive import archive_finished_schedules
+from models.database import PaymentSchedule, IntervalType, PaymentScheduleMember
+
+concurrency_limit = registry.gauge(
+    "celeris_scheduler_concurrency_limit", "Current adaptive limit on concurrent scheduler payouts"
+)
+
+# Seconds per interval unit; months use a 30 day approximation
+INTERVAL_SECONDS = {
+    IntervalType.SECONDS: 1,
+    IntervalType.MINUTES: 60,
+    IntervalType.HOURS: 3600,
+    IntervalType.DAYS: 86400,
+    IntervalType.MONTHS: 2592000,
+}
+
+# Fractional part of the golden ratio: consecutive schedule IDs land far apart
+# within the spread window, so schedules created in a burst come out evenly
+# staggered instead of clustered
+_SPREAD_STEP = 0.6180339887498949
+
+
+def spread_offset(schedule) -> float:
+    """Seconds a spread schedule's payouts are shifted within its window."""
+    return (schedule.id * _SPREAD_STEP) % 1 * schedule.spread_seconds
+
+
+def is_due(schedule, current_time: datetime) -> bool:
+    """
+    Whether ``schedule`` should pay out at ``current_time``.
+
+    Without a spread the next payout is due one interval after the last one.
+    With ``spread_seconds`` set, payouts are due on a fixed grid of intervals
+    starting one interval plus the schedule's offset after creation; keeping
+    to that grid means a catch-up payout after downtime doesn't pull every
+    schedule back into the same instant. Only the timing moves, every payout
+    still pays ``amount`` until ``total_points`` is reached.
+    """
+    interval_seconds = schedule.interval_value * INTERVAL_SECONDS[schedule.interval_type]
+    if not schedule.spread_seconds:
+        return (current_time - schedule.last_paid_at).total_seconds() >= interval_seconds
+
+    offset = spread_offset(schedule)
+    current_slot = ((current_time - schedule.created_at).total_seconds() - offset) // interval_seconds
+    last_slot = ((schedule.last_paid_at - schedule.created_at).total_seconds() - offset) // interval_seconds
+    return current_slot >= 1 and current_slot > last_slot
+
+
+class PaymentScheduler:
+    """
+    Pays out due individual schedules and archives finished ones.
+
+    Runs either inside the bot process (started by the Menu cog) or on its own
+    from ``python -m scheduler_worker``. It only needs the database, the points
+    clients and a Discord client that can ``fetch_user`` for payment DMs, which
+    works over REST without a gateway connection.
+    """
+
+    # Finished schedules are moved to the archive tables in batches of this size
+    COMPACTION_BATCH_SIZE = 500
+    COMPACTION_INTERVAL = 300  # seconds between compaction passes
+    POLL_INTERVAL = 0.1  # seconds between payment passes
+    RECORD_ATTEMPTS = 5  # tries to write a payout DRIP has applied
+    RECORD_BACKOFF = 0.1  # seconds before the first retry, doubled each time
+    SHUTDOWN_TIMEOUT = 30  # seconds the payment pass in flight gets to finish on close
+
+    def __init__(self, client, db_manager, points_clients, logger):
+        self.client = client
+        self.db_manager = db_manager
+        # PointsClientRegistry; each schedule is paid from its guild's realm
+        self.points_clients = points_clients
+        self.logger = logger
+        self._tasks = []
+        self._closing = False
+        self._closed = asyncio.Event()
+        # schedule id -> payouts DRIP applied that couldn't be written yet; the
+        # schedule sits out payment passes until they are, or it would be paid again
+        self._unrecorded: Dict[int, List[tuple]] = {}
+        # Payout concurrency follows what DRIP sustains: it grows while calls
+        # stay under the latency target and halves on errors or slow calls
+        self.limiter = AdaptiveLimiter(
+            initial=int(os.getenv("SCHEDULER_CONCURRENCY", "4")),
+            max_limit=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "64")),
+            latency_target=float(os.getenv("SCHEDULER_LATENCY_TARGET", "1.0"))
+        )
+        concurrency_limit.set(self.limiter.limit)
+
+    def start(self) -> None:
+        """Start the payment and compaction loops as background tasks."""
+        if not self._tasks:
+            self._closing = False
+            self._closed.clear()
+            self._tasks = [
+                asyncio.create_task(self.process_payments()),
+                asyncio.create_task(self.compact_schedules()),
+            ]
+
+    async def close(self) -> None:
+        """
+        Stop the loops without dropping payouts: no new payment pass starts,
+        the one in flight gets up to ``SHUTDOWN_TIMEOUT`` seconds to pay and
+        record, and payouts DRIP applied that still couldn't be written are
+        logged so they can be recorded by hand.
+        """
+        if not self._tasks:
+            return
+        self._closing = True
+        self._closed.set()
+        payments, compaction = self._tasks
+        self._tasks = []
+        # Archiving is idempotent and each batch is its own transaction
+        compaction.cancel()
+        _, pending = await asyncio.wait([payments], timeout=self.SHUTDOWN_TIMEOUT)
+        if pending:
+            self.logger.warning("Cancelling payment pass still running at shutdown")
+            payments.cancel()
+            await asyncio.gather(payments, return_exceptions=True)
+        await asyncio.gather(compaction, return_exceptions=True)
+
+        held = [
+            {"schedule_id": schedule.id, "user_id": user_id, "amount": amount, "paid_at": paid_at.isoformat()}
+            for pending_payouts in self._unrecorded.values()
+            for schedule, user_id, amount, paid_at in pending_payouts
+        ]
+        if held:
+            self.logger.critical(
+                "Scheduled payouts were applied but not recorded; they will be paid again "
+                "unless recorded by hand",
+                extra={"payouts": held}
+            )
+
+    async def run(self) -> None:
+        """Run both loops until ``close`` is called."""
+        self.start()
+        await self._closed.wait()
+
+    async def process_payments(self):
+        while not self._closing:
+            try:
+                await self.process_due_payments()
+            except Exception as e:
+                self.logger.exception("Error in payment processing", extra={"error": str(e)})
+
+            # Small sleep between iterations to prevent CPU overload
+            try:
+                await asyncio.wait_for(self._closed.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+        # Last chance for payouts the final pass couldn't write
+        await self._retry_unrecorded()
+
+    async def process_due_payments(self) -> None:
+        """Make one pass over the active individual schedules and pay those that are due."""
+        await self._retry_unrecorded()
+        current_time = datetime.utcnow()
+        due = await asyncio.to_thread(self._load_due_schedules, current_time, set(self._unrecorded))
+        # Schedules are paid concurrently, within the adaptive limit
+        await asyncio.gather(*(
+            self._pay_schedule(schedule, user_ids, current_time)
+            for schedule, user_ids in due
+        ))
+
+    def _load_due_schedules(
+        self, current_time: datetime, held: Set[int]
+    ) -> List[Tuple[PaymentSchedule, List[int]]]:
+        session = self.db_manager.Session()
+        try:
+            individual_schedules = session.query(PaymentSchedule)\
+                .join(PaymentScheduleMember)\
+                .filter(
+                    PaymentSchedule.organization_id.is_(None),
+                    PaymentSchedule.cancelled_at.is_(None),
+                    PaymentSchedule.points_paid < PaymentSchedule.total_points
+                ).all()
+
+            due = []
+            for schedule in individual_schedules:
+                if schedule.id not in held and is_due(schedule, current_time):
+                    user_ids = [
+                        user_id for (user_id,) in session.query(PaymentScheduleMember.user_id)
+                        .filter_by(schedule_id=schedule.id)
+                    ]
+                    due.append((schedule, user_ids))
+
+            # Hand detached snapshots to the payout tasks; each payout is
+            # written back in its own transaction
+            session.expunge_all()
+            return due
+        finally:
+            session.close()
+
+    async def _pay_schedule(self, schedule, user_ids: List[int], current_time: datetime) -> None:
+        client = self.points_clients.for_guild(schedule.guild_id)
+        for user_id in user_ids:
+            try:
+                # Check if we've reached total points
+                if schedule.points_paid >= schedule.total_points:
+                    return
+
+                # Calculate remaining points
+                remaining = schedule.total_points - schedule.points_paid
+                payment_amount = min(schedule.amount, remaining)
+
+                # Process the payment
+                try:
+                    success = await self.limiter.call(client.add_points, user_id=user_id, amount=payment_amount)
+                finally:
+                    concurrency_limit.set(self.limiter.limit)
+                if not success:
+                    continue
+
+                schedule.points_paid += payment_amount
+                schedule.last_paid_at = current_time
+                if not await self._record_with_retry(schedule, user_id, payment_amount, current_time):
+                    self.logger.error(
+                        "Holding schedule until its payout is recorded",
+                        extra={"schedule_id": schedule.id, "user_id": user_id, "amount": payment_amount}
+                    )
+                    self._unrecorded.setdefault(schedule.id, []).append(
+                        (schedule, user_id, payment_amount, current_time)
+                    )
+                    continue
+
+            except Exception as e:
+                self.logger.error(
+                    "Failed to process scheduled payment",
+                    extra={"schedule_id": schedule.id, "user_id": user_id, "error": str(e)}
+                )
+                continue
+
+            await self._notify(schedule, user_id, payment_amount)
+
+    async def _record_with_retry(self, schedule, user_id: int, amount: int, current_time: datetime) -> bool:
+        """Write a payout, retrying with backoff (e.g. while SQLite is locked)."""
+        delay = self.RECORD_BACKOFF
+        for attempt in range(1, self.RECORD_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._record_payout, schedule, user_id, amount, current_time)
+                return True
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to record scheduled payment",
+                    extra={"schedule_id": schedule.id, "user_id": user_id, "attempt": attempt, "error": str(e)}
+                )
+                if attempt < self.RECORD_ATTEMPTS:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        return False
+
+    async def _retry_unrecorded(self) -> None:
+        """Write held payouts in order; a schedule rejoins the passes once all of its payouts are written."""
+        for schedule_id, pending in list(self._unrecorded.items()):
+            while pending:
+                schedule, user_id, amount, paid_at = pending[0]
+                if not await self._record_with_retry(schedule, user_id, amount, paid_at):
+                    break
+                pending.pop(0)
+                await self._notify(schedule, user_id, amount)
+            if not pending:
+                del self._unrecorded[schedule_id]
+
+    def _record_payout(self, schedule, user_id: int, amount: int, current_time: datetime) -> None:
+        session = self.db_manager.Session()
+        try:
+            session.execute(
+                update(PaymentSchedule)
+                .where(PaymentSchedule.id == schedule.id)
+                .values(points_paid=PaymentSchedule.points_paid + amount, last_paid_at=current_time)
+            )
+            record_payouts(session, [{
+                "schedule_id": schedule.id,
+                "guild_id": schedule.guild_id,
+                "organization_id": schedule.organization_id,
+                "user_id": user_id,
+                "amount": amount,
+                "paid_at": current_time
+            }])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def _notify(self, schedule, user_id: int, amount: int) -> None:
+        try:
+            user = await self.client.fetch_user(user_id)
+            progress, progress_bar = calculate_schedule_progress(
+                schedule.points_paid,
+                schedule.total_points
+            )
+
+            embed = get_embed(
+                "individual_payment_received",
+                amount=amount,
+                progress_bar=progress_bar,
+                progress=progress,
+                points_paid=schedule.points_paid,
+                total_points=schedule.total_points,
+                interval_value=schedule.interval_value,
+                interval_type=schedule.interval_type.value,
+                schedule_id=schedule.id
+            )
+            await user.send(embed=embed)
+        except Exception as e:
+            self.logger.warning(
+                "Failed to send payment DM",
+                extra={"schedule_id": schedule.id, "user_id": user_id, "error": str(e)}
+            )
+
+    def _archive_batch(self) -> int:
+        session = self.db_manager.Session()
+        try:
+            return archive_finished_schedules(session, self.COMPACTION_BATCH_SIZE)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def compact_schedules(self):
+        """Keep the active schedule tables small by archiving finished schedules"""
+        while True:
+            try:
+                archived = 0
+                while True:
+                    # Run off the event loop so large batches don't stall interactions
+                    moved = await asyncio.to_thread(self._archive_batch)
+                    archived += moved
+                    if moved < self.COMPACTION_BATCH_SIZE:
+                        break
+                if archived:
+                    self.logger.info(f"Archived {archived} finished payment schedule(s)")
+            except Exception as e:
+                self.logger.error(f"Error in schedule compaction: {e}")
+
+            await asyncio.sleep(self.COMPACTION_INTERVAL)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from helpers.SimplePointsManager import PointsClient
+
+
+class PointsClientRegistry:
+    """
+    Maps guilds to DRIP realms and hands out one ``PointsClient`` per realm.
+
+    Realm clients are created on first use, each with its own connection
+    pool and rate limiter, so a busy realm cannot starve the others. Clients
+    that have been idle for ``idle_timeout`` seconds are closed and dropped;
+    the next request for that realm recreates them. Guilds without a mapping
+    use the default realm from the environment, which is never evicted.
+
+    The mapping is read from the JSON file named by REALM_CONFIG::
+
+        {
+            "realms": {
+                "<realm id>": {"api_key": "...", "rate_limit": 10, "burst": 20, "pool_size": 10,
+                                "hedge_percentile": 95, "hedge_budget": 0.05}
+            },
+            "guilds": {"<guild id>": "<realm id>"}
+        }
+    """
+
+    def __init__(
+        self,
+        default: PointsClient,
+        realms: Optional[Dict[str, dict]] = None,
+        guilds: Optional[Dict[int, str]] = None,
+        idle_timeout: float = 600,
+        sweep_interval: float = 60
+    ):
+        self.default = default
+        self.realms = realms or {}
+        self.guilds = guilds or {}
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._clients: Dict[str, PointsClient] = {}
+        self._sweep_task = None
+
+    @classmethod
+    def from_env(cls, default: PointsClient) -> "PointsClientRegistry":
+        path = os.getenv("REALM_CONFIG")
+        idle_timeout = float(os.getenv("REALM_CLIENT_IDLE_TIMEOUT", "600"))
+        if not path:
+            return cls(default, idle_timeout=idle_timeout)
+
+        with open(path, encoding="utf-8") as config_file:
+            config = json.load(config_file)
+
+        realms = config.get("realms", {})
+        guilds = {int(guild_id): str(realm_id) for guild_id, realm_id in config.get("guilds", {}).items()}
+        unknown = set(guilds.values()) - set(realms)
+        if unknown:
+            raise ValueError(f"REALM_CONFIG maps guilds to undefined realms: {', '.join(sorted(unknown))}")
+        return cls(default, realms, guilds, idle_timeout=idle_timeout)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def for_guild(self, guild_id: Optional[int]) -> PointsClient:
+        """Client for the realm ``guild_id`` is mapped to, or the default realm."""
+        realm_id = self.guilds.get(guild_id) if guild_id is not None else None
+        if realm_id is None:
+            return self.default
+        return self.for_realm(realm_id)
+
+    def for_realm(self, realm_id: str) -> PointsClient:
+        client = self._clients.get(realm_id)
+        if client is None:
+            settings = self.realms[realm_id]
+            client = self._clients[realm_id] = PointsClient(
+                base_url=settings.get("base_url") or self.default.base_url,
+                api_key=settings["api_key"],
+                realm_id=realm_id,
+                pool_size=settings.get("pool_size", 20),
+                rate_limit=settings.get("rate_limit"),
+                burst=settings.get("burst", 10),
+                hedge_percentile=settings.get("hedge_percentile"),
+                hedge_budget=settings.get("hedge_budget", 0.05)
+            )
+        client.last_used = time.monotonic()
+        return client
+
+    async def evict_idle(self) -> int:
+        """Close realm clients with no requests in flight and none for ``idle_timeout``."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [
+            realm_id for realm_id, client in self._clients.items()
+            if client.in_flight == 0 and client.last_used < cutoff
+        ]
+        for realm_id in idle:
+            await self._clients.pop(realm_id).cleanup()
+        return len(idle)
+
+    def start(self) -> None:
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.evict_idle()
+
+    async def close(self) -> None:
+        """Stop the sweeper and close every realm client (the default is left alone)."""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.cleanup()
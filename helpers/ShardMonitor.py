@@ -0,0 +1,86 @@
+import asyncio
+import math
+import time
+from typing import Dict, List
+
+from helpers.metrics import registry
+
+shard_latency = registry.gauge(
+    "celeris_shard_latency_seconds", "Gateway heartbeat latency per shard"
+)
+shard_event_rate = registry.gauge(
+    "celeris_shard_events_per_second", "Gateway dispatch events received per second, per shard"
+)
+shard_events = registry.counter(
+    "celeris_shard_events_total", "Gateway dispatch events received, per shard"
+)
+
+
+class ShardMonitor:
+    """
+    Samples every shard of this process on a fixed interval.
+
+    Event rates come from the gateway sequence number, which Discord increments
+    once per dispatch event on a shard, so no per-event hook is needed.
+    """
+
+    def __init__(self, bot, interval: float = 15.0):
+        self.bot = bot
+        self.interval = interval
+        self._task = None
+        # shard id -> (sequence, sampled at)
+        self._last: Dict[int, tuple] = {}
+        self._rates: Dict[int, float] = {}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                self.bot.logger.warning("Shard sampling failed", extra={"error": str(e)})
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        for shard_id, shard in self.bot.shards.items():
+            latency = shard.latency
+            shard_latency.set(latency if math.isfinite(latency) else -1, shard=str(shard_id))
+
+            # ShardInfo has no public accessor for its websocket
+            ws = getattr(shard._parent, "ws", None)
+            sequence = getattr(ws, "sequence", None)
+            if sequence is None:
+                continue
+
+            previous = self._last.get(shard_id)
+            self._last[shard_id] = (sequence, now)
+            # A new gateway session restarts the sequence, so skip that sample
+            if previous is None or sequence < previous[0]:
+                continue
+
+            events = sequence - previous[0]
+            rate = events / (now - previous[1])
+            self._rates[shard_id] = rate
+            shard_events.inc(events, shard=str(shard_id))
+            shard_event_rate.set(rate, shard=str(shard_id))
+
+    def status(self) -> List[dict]:
+        """Per-shard snapshot for the health endpoint."""
+        return [
+            {
+                "id": shard_id,
+                "connected": not shard.is_closed() and math.isfinite(shard.latency),
+                "latency_ms": round(shard.latency * 1000, 1) if math.isfinite(shard.latency) else None,
+                "events_per_second": round(self._rates.get(shard_id, 0.0), 2),
+            }
+            for shard_id, shard in sorted(self.bot.shards.items())
+        ]
@@ -1,27 +1,209 @@
+import asyncio
+from collections import deque
+import json
+from contextlib import asynccontextmanager
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
 import aiohttp
-from typing import Optional
 
-class PointsManagerSingleton:
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def __init__(self, base_url: str = None, api_key: str = None, realm_id: str = None):
-        if not self._initialized and all([base_url, api_key, realm_id]):
-            self.base_url = base_url.rstrip('/')
-            self.api_key = api_key
-            self.realm_id = realm_id
-            self.session: Optional[aiohttp.ClientSession] = None
-            self._initialized = True
-    
+from helpers.metrics import registry
+from helpers.tracing import http_trace_config, PHASE_POINTS
+
+T = TypeVar("T")
+
+hedged_reads = registry.counter(
+    "celeris_points_hedged_reads_total", "DRIP reads that sent a second request, by which one answered first"
+)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Phrases DRIP uses in error messages when the sender can't cover an amount
+INSUFFICIENT_FUNDS_MARKERS = ("insufficient", "not enough", "exceeds balance")
+
+
+class PointsResult:
+    """
+    Outcome of a DRIP mutation.
+
+    Truthy when the request succeeded, so ``if await client.add_points(...)``
+    keeps working. On failure ``status`` is the HTTP status and ``error`` the
+    parsed error body (a dict for JSON bodies, otherwise the raw text).
+    ``balance`` is the member's balance after a successful balance change,
+    when it is known.
+    """
+
+    def __init__(self, ok: bool, status: int, error: Any = None, balance: Optional[int] = None):
+        self.ok = ok
+        self.status = status
+        self.error = error
+        self.balance = balance
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def __repr__(self) -> str:
+        return f"PointsResult(ok={self.ok}, status={self.status}, error={self.error!r}, balance={self.balance})"
+
+    @property
+    def message(self) -> str:
+        """Human readable error message, empty on success."""
+        if self.ok:
+            return ""
+        if isinstance(self.error, dict):
+            return str(self.error.get("message") or self.error.get("error") or self.error)
+        return str(self.error or f"HTTP {self.status}")
+
+    @property
+    def insufficient_funds(self) -> bool:
+        if self.ok or self.status >= 500:
+            return False
+        message = self.message.lower()
+        return any(marker in message for marker in INSUFFICIENT_FUNDS_MARKERS)
+
+    @classmethod
+    async def from_response(cls, response: aiohttp.ClientResponse) -> "PointsResult":
+        text = await response.text()
+        try:
+            body = json.loads(text) if text else None
+        except ValueError:
+            body = text
+        if response.status == 200:
+            return cls(True, response.status, balance=_balance_from(body))
+        return cls(False, response.status, body)
+
+
+def _balance_from(body: Any) -> Optional[int]:
+    """
+    The realm balance from a response's ``balances`` map, the member shape
+    DRIP documents. Anything else (e.g. the ``tokens`` delta echoed back by
+    tokenBalance) isn't a balance, so callers fall back instead.
+    """
+    if not isinstance(body, dict) or not isinstance(body.get("balances"), dict):
+        return None
+    # Same shape as GET /members/{id}: the realm's only point type comes first
+    return next(iter(body["balances"].values()), 0)
+
+
+class HedgePolicy:
+    """
+    Hedged reads: if a read hasn't answered within the ``percentile`` latency
+    of recent reads, send an identical second request and use whichever
+    answers first.
+
+    ``budget`` caps hedges at that fraction of the last ``window`` reads, so
+    a DRIP slowdown that delays every request adds at most that much extra
+    load. No hedges are sent until ``min_samples`` latencies are known.
+    """
+
+    def __init__(self, percentile: float = 95, budget: float = 0.05, window: int = 1000, min_samples: int = 50):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there isn't enough history."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))]
+
+    def _may_hedge(self) -> bool:
+        return sum(self._hedged) < self.budget * len(self._hedged)
+
+    async def run(self, request: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        delay = self.delay()
+        primary = asyncio.create_task(request())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._may_hedge():
+                self._hedged.append(False)
+                result = await primary
+                self._latencies.append(time.perf_counter() - start)
+                return result
+
+            self._hedged.append(True)
+            hedge = asyncio.create_task(request())
+            tasks.add(hedge)
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        # A lower bound on the primary's latency, which is
+                        # what the delay estimates
+                        self._latencies.append(time.perf_counter() - start)
+                        hedged_reads.inc(winner="hedge" if task is hedge else "primary")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class PointsClient:
+    """
+    DRIP API client for one realm.
+
+    Each client owns its own connection pool (``pool_size`` connections) and,
+    when ``rate_limit`` is set, a token bucket shared by all of its requests.
+    Setting ``hedge_percentile`` hedges ``get_balance`` with a ``HedgePolicy``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        realm_id: str,
+        pool_size: int = 20,
+        rate_limit: Optional[float] = None,
+        burst: int = 10,
+        hedge_percentile: Optional[float] = None,
+        hedge_budget: float = 0.05
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.realm_id = realm_id
+        self.pool_size = pool_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._limiter = RateLimiter(rate_limit, burst) if rate_limit else None
+        self._hedge = HedgePolicy(hedge_percentile, hedge_budget) if hedge_percentile else None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
     async def initialize(self):
         """Initialize the aiohttp session if it doesn't exist."""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                trace_configs=[http_trace_config(PHASE_POINTS)]
+            )
 
     async def cleanup(self):
         """Cleanup the aiohttp session."""
@@ -33,58 +215,116 @@ class PointsManagerSingleton:
         """Get headers with API key authentication."""
         return {"Authorization": f"Bearer {self.api_key}"}
 
-    async def get_balance(self, user_id: int) -> int:
-        """Get the point balance for a user."""
-        if not self.session:
-            await self.initialize()
-            
-        headers = await self._get_headers()
-        
-        async with self.session.get(
-            f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{user_id}",
-            headers=headers
-        ) as response:
-            if response.status == 200:
-                data = await response.json()
-                if not data.get('balances'):
-                    return 0
-                realm_point_ids = list(data['balances'].keys())
-                return data['balances'].get(realm_point_ids[0], 0)
-            else:
-                error_data = await response.json()
-                raise Exception(f"Failed to get balance: {error_data}")
-
-    async def add_points(self, user_id: int, amount: int) -> bool:
-        """Add points to a user's balance."""
+    @asynccontextmanager
+    async def _request_slot(self):
+        """Wait for the rate limiter and mark the client busy for the request."""
         if not self.session:
             await self.initialize()
-            
-        headers = await self._get_headers()
-        
-        async with self.session.patch(
-            f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{user_id}/tokenBalance",
-            headers=headers,
-            json={"tokens": amount}
-        ) as response:
-            return response.status == 200
-
-    async def remove_points(self, user_id: int, amount: int) -> bool:
+        if self._limiter is not None:
+            await self._limiter.acquire()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def ping(self, timeout: float = 2.0) -> bool:
+        """Check that the DRIP API answers; any non-5xx response counts as reachable."""
+        async with self._request_slot():
+            headers = await self._get_headers()
+
+            async with self.session.get(
+                f"{self.base_url}/api/v4/realms/{self.realm_id}",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                return response.status < 500
+
+    async def get_balance(self, user_id: int) -> int:
+        """Get the point balance for a user."""
+        if self._hedge is None:
+            return await self._fetch_balance(user_id)
+        return await self._hedge.run(lambda: self._fetch_balance(user_id))
+
+    async def _fetch_balance(self, user_id: int) -> int:
+        async with self._request_slot():
+            headers = await self._get_headers()
+
+            async with self.session.get(
+                f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{user_id}",
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if not data.get('balances'):
+                        return 0
+                    realm_point_ids = list(data['balances'].keys())
+                    return data['balances'].get(realm_point_ids[0], 0)
+                else:
+                    error_data = await response.json()
+                    raise Exception(f"Failed to get balance: {error_data}")
+
+    async def add_points(self, user_id: int, amount: int, balance_before: Optional[int] = None) -> PointsResult:
+        """
+        Add points to a user's balance.
+
+        The result's ``balance`` comes from the tokenBalance response, or else
+        from ``balance_before`` plus ``amount``. Only pass ``balance_before``
+        when the caller has just read it for this change; without either the
+        balance is None.
+        """
+        async with self._request_slot():
+            headers = await self._get_headers()
+
+            async with self.session.patch(
+                f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{user_id}/tokenBalance",
+                headers=headers,
+                json={"tokens": amount}
+            ) as response:
+                result = await PointsResult.from_response(response)
+
+        if result and result.balance is None and balance_before is not None:
+            result.balance = balance_before + amount
+        return result
+
+    async def remove_points(self, user_id: int, amount: int, balance_before: Optional[int] = None) -> PointsResult:
         """Remove points from a user's balance."""
-        return await self.add_points(user_id, -amount)
+        return await self.add_points(user_id, -amount, balance_before)
 
-    async def transfer_points(self, from_user_id: int, to_user_id: int, amount: int) -> bool:
-        """Transfer points from one user to another."""
-        if not self.session:
-            await self.initialize()
-            
-        headers = await self._get_headers()
-        
-        async with self.session.patch(
-            f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{from_user_id}/transfer",
-            headers=headers,
-            json={
-                "recipientId": to_user_id,
-                "tokens": amount
-            }
-        ) as response:
-            return response.status == 200
\ No newline at end of file
+    async def transfer_points(self, from_user_id: int, to_user_id: int, amount: int) -> PointsResult:
+        """
+        Transfer points from one user to another.
+
+        DRIP checks the sender's balance itself; a transfer the sender can't
+        cover comes back with ``insufficient_funds`` set.
+        """
+        async with self._request_slot():
+            headers = await self._get_headers()
+
+            async with self.session.patch(
+                f"{self.base_url}/api/v4/realms/{self.realm_id}/members/{from_user_id}/transfer",
+                headers=headers,
+                json={
+                    "recipientId": to_user_id,
+                    "tokens": amount
+                }
+            ) as response:
+                return await PointsResult.from_response(response)
+
+
+class PointsManagerSingleton(PointsClient):
+    """Process-wide client for the default realm configured in the environment."""
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, base_url: str = None, api_key: str = None, realm_id: str = None, **options):
+        if not self._initialized and all([base_url, api_key, realm_id]):
+            super().__init__(base_url, api_key, realm_id, **options)
+            self._initialized = True
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+import logging
+import time
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes and logs a summary.
+
+    Phases are reported in the order they were recorded, e.g. imports,
+    database init, extension loading and command sync.
+    """
+
+    def __init__(self, logger: logging.Logger, started_at: float = None):
+        self.logger = logger
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> None:
+        total = time.perf_counter() - self.started_at
+        for name, seconds in self.phases:
+            self.logger.info(f"Startup phase {name:<12} {seconds * 1000:8.1f} ms")
+        self.logger.info(f"Startup total        {total * 1000:8.1f} ms")
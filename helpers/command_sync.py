@@ -0,0 +1,68 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger("discord_bot")
+
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Hash the payload ``tree.sync`` would upload for the given scope"""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    serialized = json.dumps(
+        {"application_id": tree.client.application_id, "commands": payload},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _load_state(state_path: str) -> dict:
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state_path: str, state: dict) -> None:
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+async def sync_if_changed(
+    tree: app_commands.CommandTree,
+    state_path: str,
+    guild: Optional[discord.abc.Snowflake] = None,
+    force: bool = False
+) -> bool:
+    """
+    Sync the command tree for ``guild`` (or globally) only if it changed.
+
+    The hash of the last successfully synced payload is persisted per scope
+    in ``state_path``, so restarts and reconnects with an unchanged tree
+    never touch the rate-limited application commands endpoint.
+    Returns whether a sync was performed.
+    """
+    scope = "global" if guild is None else str(guild.id)
+    tree_hash = command_tree_hash(tree, guild=guild)
+    state = _load_state(state_path)
+
+    if not force and state.get(scope) == tree_hash:
+        logger.info(f"Command tree unchanged for {scope}, skipping sync")
+        return False
+
+    synced = await tree.sync(guild=guild)
+    state[scope] = tree_hash
+    _save_state(state_path, state)
+    logger.info(f"Synced {len(synced)} command(s) for {scope}")
+    return True
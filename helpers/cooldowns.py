@@ -0,0 +1,192 @@
+"""
+Token-bucket cooldowns for points-mutating commands.
+
+Each command gets a bucket per user and, optionally, one per guild, so one
+user looping a command can't use up the realm's DRIP quota and neither can a
+whole guild. Buckets live in memory; ``CooldownStore.enable_persistence``
+additionally loads them from and periodically saves them to the database so
+a restart doesn't hand every user a full bucket.
+
+Slash commands use the ``token_bucket`` check decorator, which rejects the
+interaction before the callback runs and raises ``CommandOnCooldown`` with
+the time to wait. Views and modals call ``TokenBucketCooldown.acquire`` from
+their ``interaction_check``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import discord
+from discord import app_commands
+from sqlalchemy import delete, insert
+
+from helpers.embed_helpers import create_error_embed
+from models.database import CooldownBucket
+
+# (capacity, seconds to refill from empty)
+Limit = Tuple[int, float]
+
+logger = logging.getLogger("discord_bot.cooldowns")
+
+
+class CooldownStore:
+    def __init__(self):
+        # key -> (tokens, last update, time the bucket is full again), as epoch
+        # seconds so saved buckets stay meaningful across restarts
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._db_manager = None
+        self._flush_task = None
+
+    def acquire(self, limits: Dict[str, Limit]) -> float:
+        """
+        Take one token from every bucket in ``limits``, all or nothing.
+
+        Returns 0 when the call is allowed, otherwise the seconds until the
+        emptiest bucket has a token again; nothing is consumed in that case.
+        """
+        now = time.time()
+        with self._lock:
+            refilled = {}
+            retry_after = 0.0
+            for key, (capacity, per) in limits.items():
+                rate = capacity / per
+                tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                refilled[key] = (tokens, capacity, rate)
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / rate)
+
+            if retry_after:
+                return retry_after
+
+            for key, (tokens, capacity, rate) in refilled.items():
+                tokens -= 1
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+                self._dirty.add(key)
+            return 0.0
+
+    def prune(self) -> None:
+        """Forget buckets that have refilled completely; they behave like new ones."""
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+                del self._buckets[key]
+                self._dirty.discard(key)
+
+    def enable_persistence(self, db_manager, flush_interval: float = 30) -> None:
+        """Load saved buckets and start saving changed ones every ``flush_interval`` seconds."""
+        self._db_manager = db_manager
+        session = db_manager.Session()
+        try:
+            with self._lock:
+                for bucket in session.query(CooldownBucket).filter(CooldownBucket.full_at > time.time()):
+                    self._buckets[bucket.key] = (bucket.tokens, bucket.updated_at, bucket.full_at)
+        finally:
+            session.close()
+        self._flush_task = asyncio.create_task(self._flush_periodically(flush_interval))
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.prune()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                # Changed buckets stay dirty and are retried on the next flush
+                logger.warning("Failed to save cooldown buckets", extra={"error": str(e)})
+
+    def flush(self) -> None:
+        """
+        Write buckets changed since the last flush and drop refilled ones.
+
+        Buckets only stop being dirty once the write has committed, so a failed
+        flush is retried in full by the next one.
+        """
+        if self._db_manager is None:
+            return
+        with self._lock:
+            saved = {key: self._buckets[key] for key in self._dirty}
+        rows = [
+            {"key": key, "tokens": tokens, "updated_at": updated, "full_at": full_at}
+            for key, (tokens, updated, full_at) in saved.items()
+        ]
+
+        session = self._db_manager.Session()
+        try:
+            session.execute(delete(CooldownBucket).where(CooldownBucket.full_at <= time.time()))
+            if rows:
+                session.execute(delete(CooldownBucket).where(CooldownBucket.key.in_([row["key"] for row in rows])))
+                session.execute(insert(CooldownBucket), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self._lock:
+            # Keys changed again while writing stay dirty for the next flush
+            for key, state in saved.items():
+                if self._buckets.get(key) == state:
+                    self._dirty.discard(key)
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning("Failed to save cooldown buckets on shutdown", extra={"error": str(e)})
+
+
+# Process-wide store shared by every cooldown
+store = CooldownStore()
+
+
+class TokenBucketCooldown:
+    def __init__(self, name: str, user: Optional[Limit] = None, guild: Optional[Limit] = None):
+        self.name = name
+        self.user = user
+        self.guild = guild
+
+    def _limits(self, interaction: discord.Interaction) -> Dict[str, Limit]:
+        limits = {}
+        if self.user is not None:
+            limits[f"{self.name}:user:{interaction.user.id}"] = self.user
+        if self.guild is not None and interaction.guild_id is not None:
+            limits[f"{self.name}:guild:{interaction.guild_id}"] = self.guild
+        return limits
+
+    def acquire(self, interaction: discord.Interaction) -> None:
+        """Consume a token for ``interaction`` or raise ``CommandOnCooldown``."""
+        retry_after = store.acquire(self._limits(interaction))
+        if retry_after:
+            capacity, per = self.user or self.guild
+            raise app_commands.CommandOnCooldown(app_commands.Cooldown(capacity, per), retry_after)
+
+
+def token_bucket(name: str, user: Optional[Limit] = None, guild: Optional[Limit] = None):
+    """
+    App command check limiting ``name`` per user and per guild.
+
+    ``user=(5, 60)`` allows bursts of 5 calls, refilled at 5 per 60 seconds.
+    """
+    cooldown = TokenBucketCooldown(name, user, guild)
+
+    def predicate(interaction: discord.Interaction) -> bool:
+        cooldown.acquire(interaction)
+        return True
+
+    return app_commands.check(predicate)
+
+
+def cooldown_embed(error: app_commands.CommandOnCooldown) -> discord.Embed:
+    return create_error_embed(
+        title="Slow Down",
+        description=f"You're doing that too often. Try again in **{error.retry_after:.1f}** seconds."
+    )
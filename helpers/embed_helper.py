@@ -1,5 +1,7 @@
 import discord
 
+from helpers.embed_helpers import FOOTER_TEXT
+
 def create_basic_embed(title: str, description: str, add_footer: bool = False) -> discord.Embed:
     embed = discord.Embed(
         title=title,
@@ -8,6 +10,6 @@ def create_basic_embed(title: str, description: str, add_footer: bool = False) -
     )
     
     if add_footer:
-        embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
+        embed.set_footer(text=FOOTER_TEXT)
         
     return embed 
\ No newline at end of file
@@ -1,5 +1,7 @@
 from discord import Embed, Color
 
+FOOTER_TEXT = "☁   Celeris runs securely on Mallard Cloud"
+
 def calculate_schedule_progress(points_paid: int, total_points: int) -> tuple[float, str]:
     """Calculate progress percentage and generate progress bar"""
     progress = (points_paid / total_points) * 100
@@ -8,43 +10,32 @@ def calculate_schedule_progress(points_paid: int, total_points: int) -> tuple[fl
     progress_bar = '█' * filled_blocks + '░' * empty_blocks
     return progress, progress_bar
 
-def create_basic_embed(title: str, description: str = None, add_footer: bool = False) -> Embed:
+def _create_embed(title: str, description: str, color: Color, add_footer: bool) -> Embed:
     embed = Embed(
         title=title,
         description=description,
-        color=Color.blue()
+        color=color
     )
     if add_footer:
-        embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
+        embed.set_footer(text=FOOTER_TEXT)
     return embed
 
+def create_basic_embed(title: str, description: str = None, add_footer: bool = False) -> Embed:
+    return _create_embed(title, description, Color.blue(), add_footer)
+
 def create_success_embed(title: str, description: str = None, add_footer: bool = False) -> Embed:
-    embed = Embed(
-        title=title,
-        description=description,
-        color=Color.green()
-    )
-    if add_footer:
-        embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
-    return embed
+    return _create_embed(title, description, Color.green(), add_footer)
 
 def create_error_embed(title: str, description: str = None, add_footer: bool = False) -> Embed:
-    embed = Embed(
-        title=title,
-        description=description,
-        color=Color.red()
-    )
-    if add_footer:
-        embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
-    return embed
+    return _create_embed(title, description, Color.red(), add_footer)
 
 def create_schedule_embed(schedule, organization, remaining_points: int = None) -> Embed:
     embed = Embed(
         title=f"Payment Schedule for {organization.name}",
         color=Color.blue()
     )
-    
+
     # ... (existing fields remain the same) ...
-    
-    embed.set_footer(text="☁   Celeris runs securely on Mallard Cloud")
-    return embed 
\ No newline at end of file
+
+    embed.set_footer(text=FOOTER_TEXT)
+    return embed
@@ -0,0 +1,155 @@
+from typing import Any, Dict
+
+from discord import Embed, Color
+
+from helpers.embed_helpers import FOOTER_TEXT
+
+MENU_COLOR = 0x2B2D31
+
+
+class EmbedTemplate:
+    """
+    An embed serialized to a dict once and copied on every use.
+
+    Static screens call ``build()``. Dynamic ones keep ``str.format``
+    placeholders in their title/description and call ``render(**params)``,
+    which only formats those two strings on top of the prebuilt payload.
+    """
+
+    def __init__(self, embed: Embed):
+        self._payload: Dict[str, Any] = embed.to_dict()
+
+    def build(self) -> Embed:
+        return Embed.from_dict(self._copy_payload())
+
+    def render(self, **params) -> Embed:
+        payload = self._copy_payload()
+        for key in ("title", "description"):
+            if key in payload:
+                payload[key] = payload[key].format(**params)
+        return Embed.from_dict(payload)
+
+    def _copy_payload(self) -> Dict[str, Any]:
+        # Embed.from_dict keeps references to nested dicts, so copy one level
+        # deeper than the top-level keys to keep the template untouched
+        payload = dict(self._payload)
+        for key, value in payload.items():
+            if isinstance(value, dict):
+                payload[key] = dict(value)
+            elif key == "fields":
+                payload[key] = [dict(field) for field in value]
+        return payload
+
+
+_TEMPLATES: Dict[str, EmbedTemplate] = {}
+
+
+def register_template(name: str, embed: Embed) -> EmbedTemplate:
+    template = _TEMPLATES[name] = EmbedTemplate(embed)
+    return template
+
+
+def get_embed(name: str, **params) -> Embed:
+    """Return a fresh copy of template ``name``, formatted with ``params`` if given"""
+    template = _TEMPLATES[name]
+    return template.render(**params) if params else template.build()
+
+
+def _menu_embed(title: str, description: str) -> Embed:
+    embed = Embed(title=title, description=description, color=MENU_COLOR)
+    embed.set_footer(text=FOOTER_TEXT)
+    return embed
+
+
+_welcome = _menu_embed(
+    "Welcome to Celeris",
+    "Get Started\n\nCreate and manage organizations, automate payments, and more!"
+)
+_welcome.add_field(
+    name="🔑 Key Features",
+    value="• Create organizations\n• Set up automated payments\n• Manage members and roles\n• Track payment history",
+    inline=False
+)
+_welcome.add_field(
+    name="💡 Quick Start",
+    value="Click 'Create Organization' to begin!",
+    inline=False
+)
+register_template("welcome", _welcome)
+
+register_template("main_menu", Embed(
+    title="Main Menu",
+    description="Select an option below:",
+    color=Color.blue()
+))
+
+register_template("org_manager", _menu_embed(
+    "Organization Manager",
+    "Create and manage your organizations\n\n"
+    "**Available Commands**\n"
+    "• `/org create` - Create a new organization\n"
+    "• `/org invite` - Invite members to your organization\n"
+    "• `/org kick` - Remove members from your organization\n"
+    "• `/org transfer` - Transfer organization ownership\n"
+    "• `/pay_org` - Create automated payments for your organization"
+))
+
+register_template("payment_manager", _menu_embed(
+    "Payment Manager",
+    "Manage payment schedules and view history\n\n"
+    "**Available Commands**\n"
+    "• `/pay` - Create individual payment schedule\n"
+    "• `/pay_org` - Create organization payment schedule\n"
+    "• `/schedule list` - View your active schedules\n"
+    "• `/schedule cancel` - Cancel a payment schedule"
+))
+
+register_template("help", _menu_embed(
+    "Available Commands",
+    "Here are all available commands:\n\n"
+    "**Payment Commands**\n"
+    "• `/pay @user <amount> <interval> <total> [spread]` - Create individual payment schedule\n"
+    "• `/pay_org <org> <amount> <interval> <total>` - Create organization payment schedule\n"
+    "• `/cancel_schedule <id>` - Cancel a payment schedule\n"
+    "• `/history [user] [schedule_id]` - View payout history\n"
+    "• `/job <id>` - Check the progress of a background job\n\n"
+    "**Organization Commands**\n"
+    "• `/org create <name>` - Create a new organization\n"
+    "• `/org invite @user` - Invite someone to your organization\n"
+    "• `/org kick @user` - Remove someone from your organization"
+))
+
+_individual_payment = Embed(
+    title="Payment Received",
+    description=(
+        "**Individual Payment**\n"
+        "You've received a scheduled payment!\n\n"
+        "💰 **Amount Received**\n{amount:,} points\n\n"
+        "📊 **Schedule Progress**\n{progress_bar} {progress:.1f}%\n"
+        "({points_paid}/{total_points} points)\n\n"
+        "⏰ **Payment Details**\n"
+        "• Frequency: Every {interval_value} {interval_type}\n"
+        "• Schedule ID: #{schedule_id}\n\n"
+        "👤 Individual Payment • Automated Payment"
+    ),
+    color=Color.green()
+)
+_individual_payment.set_footer(text=FOOTER_TEXT)
+register_template("individual_payment_received", _individual_payment)
+
+register_template("organization_payment_received", Embed(
+    title="Payment Received",
+    description=(
+        "**Organization Payment**\n"
+        "You've received a scheduled payment!\n\n"
+        "💰 **Amount Received**\n{amount:,} points\n\n"
+        "📊 **Schedule Progress**\n{progress_bar} {progress:.1f}%\n"
+        "({points_paid}/{total_points} points)\n\n"
+        "⏰ **Payment Details**\n"
+        "• Frequency: Every {interval_value} {interval_type}\n"
+        "• Organization: {organization}\n"
+        "• Schedule ID: #{schedule_id}\n\n"
+        "👥 Organization Payment • Automated Payment"
+    ),
+    color=Color.green()
+))
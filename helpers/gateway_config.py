@@ -0,0 +1,51 @@
+"""
+Gateway intents and cache settings.
+
+The cogs only read the invoking user and the ``discord.Member`` arguments
+Discord resolves into each interaction, so the member list of every guild
+never has to be requested or cached. The ``minimal`` profile (default) keeps
+just the guild cache plus message events for the owner-only prefix commands;
+``full`` restores the previous members intent with default member caching.
+"""
+import os
+from typing import Any, Dict
+
+import discord
+
+PROFILES = ("minimal", "full")
+
+
+def _member_cache_flags(intents: discord.Intents) -> discord.MemberCacheFlags:
+    # MEMBER_CACHE overrides the profile, e.g. "none" or "joined,voice"
+    raw = os.getenv("MEMBER_CACHE", "").strip().lower()
+    if not raw:
+        return discord.MemberCacheFlags.from_intents(intents)
+    if raw == "none":
+        return discord.MemberCacheFlags.none()
+    return discord.MemberCacheFlags(**{flag.strip(): True for flag in raw.split(",") if flag.strip()})
+
+
+def gateway_options(profile: str = None) -> Dict[str, Any]:
+    """Client keyword arguments for the GATEWAY_PROFILE (or ``profile``) setting."""
+    profile = (profile or os.getenv("GATEWAY_PROFILE", "minimal")).strip().lower()
+    if profile not in PROFILES:
+        raise ValueError(f"GATEWAY_PROFILE must be one of: {', '.join(PROFILES)}")
+
+    if profile == "minimal":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        # Mentions of the bot carry their content without the message content intent
+        intents.guild_messages = True
+        intents.dm_messages = True
+        options = {"max_messages": None}
+    else:
+        intents = discord.Intents.default()
+        intents.members = True
+        options = {}
+
+    options.update(
+        intents=intents,
+        member_cache_flags=_member_cache_flags(intents),
+        chunk_guilds_at_startup=os.getenv("CHUNK_GUILDS_AT_STARTUP", "").lower() in ("1", "true", "yes")
+    )
+    return options
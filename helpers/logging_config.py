@@ -0,0 +1,140 @@
+"""
+Non-blocking logging pipeline for the bot.
+
+Loggers only enqueue records through a ``QueueHandler``; a ``QueueListener``
+thread does the formatting and the console/file I/O, so a log call never
+blocks the event loop on a disk write.
+"""
+from datetime import datetime, timezone
+import json
+import logging
+import logging.handlers
+import queue
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {
+        key: value for key, value in vars(record).items()
+        if key not in _RESERVED_ATTRS and not key.startswith("_")
+    }
+
+
+def _with_fields(line: str, record: logging.LogRecord) -> str:
+    fields = _extra_fields(record)
+    if not fields:
+        return line
+    return line + " " + " ".join(f"{key}={value}" for key, value in fields.items())
+
+
+class LoggingFormatter(logging.Formatter):
+    # Colors
+    black = "\x1b[30m"
+    red = "\x1b[31m"
+    green = "\x1b[32m"
+    yellow = "\x1b[33m"
+    blue = "\x1b[34m"
+    gray = "\x1b[38m"
+    # Styles
+    reset = "\x1b[0m"
+    bold = "\x1b[1m"
+
+    COLORS = {
+        logging.DEBUG: gray + bold,
+        logging.INFO: blue + bold,
+        logging.WARNING: yellow + bold,
+        logging.ERROR: red,
+        logging.CRITICAL: red + bold,
+    }
+
+    def __init__(self):
+        super().__init__()
+        # Build one formatter per level up front instead of one per record
+        self._formatters = {
+            level: logging.Formatter(
+                f"{self.black}{self.bold}{{asctime}}{self.reset} "
+                f"{color}{{levelname:<8}}{self.reset} "
+                f"{self.green}{self.bold}{{name}}{self.reset} {{message}}",
+                "%Y-%m-%d %H:%M:%S",
+                style="{"
+            )
+            for level, color in self.COLORS.items()
+        }
+
+    def format(self, record):
+        formatter = self._formatters.get(record.levelno, self._formatters[logging.INFO])
+        return _with_fields(formatter.format(record), record)
+
+
+class PlainFormatter(logging.Formatter):
+    """Uncolored text for the log file, with ``extra`` fields as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{")
+
+    def format(self, record):
+        return _with_fields(super().format(record), record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed via ``extra``."""
+
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+def setup_logging(
+    name: str = "discord_bot",
+    level: int = logging.INFO,
+    log_file: str = "discord.log",
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    json_file: bool = False
+) -> logging.handlers.QueueListener:
+    """
+    Route ``name`` and its children through a queue to console and a rotating file.
+
+    Returns the started listener; call ``stop()`` on shutdown to flush it.
+    """
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(LoggingFormatter())
+
+    # File handler, rotated by size
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=log_file,
+        encoding="utf-8",
+        maxBytes=max_bytes,
+        backupCount=backup_count
+    )
+    if json_file:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(PlainFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+
+    listener.start()
+    return listener
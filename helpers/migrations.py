@@ -0,0 +1,417 @@
+"""
+Versioned schema migrations applied on startup.
+
+``Base.metadata.create_all`` only creates missing tables, it never alters
+existing ones. Every change to an existing table gets an entry in
+``MIGRATIONS``; each step must be safe to run against a database that
+``create_all`` has just created with the current schema.
+"""
+from datetime import datetime
+import json
+import logging
+import os
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, inspect, text
+)
+from sqlalchemy.schema import CreateTable
+
+from models.database import IntervalType
+
+logger = logging.getLogger("discord_bot")
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    return any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+def _add_schedule_cancelled_at(conn):
+    if not _has_column(conn, "payment_schedules", "cancelled_at"):
+        conn.execute(text("ALTER TABLE payment_schedules ADD COLUMN cancelled_at DATETIME"))
+
+
+# Discord snowflake columns that used to be stored as strings
+SNOWFLAKE_COLUMNS = {
+    "organizations": ("owner_id",),
+    "organization_members": ("user_id",),
+    "payment_schedules": ("user_id", "created_by"),
+    "payment_schedule_members": ("user_id",),
+    "payment_schedules_archive": ("user_id", "created_by"),
+    "payment_schedule_members_archive": ("user_id",),
+    "payouts": ("user_id",),
+}
+
+
+# The affected tables as they stood at migration 2. Migrations build from
+# these fixed definitions, never from the live models, so later model
+# changes can't alter what an old migration does.
+SNOWFLAKE_SCHEMA = MetaData()
+Table(
+    "organizations", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, index=True),
+    Column("owner_id", BigInteger, index=True),
+    Column("created_at", DateTime),
+)
+Table(
+    "organization_members", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("organization_id", Integer, ForeignKey("organizations.id")),
+    Column("user_id", BigInteger, index=True),
+    Column("joined_at", DateTime),
+    Index("ix_organization_members_org_user", "organization_id", "user_id"),
+)
+Table(
+    "payment_schedules", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("organization_id", Integer, ForeignKey("organizations.id"), nullable=True),
+    Column("user_id", BigInteger, nullable=True),
+    Column("amount", Integer),
+    Column("interval_type", Enum(IntervalType)),
+    Column("interval_value", Integer),
+    Column("last_paid_at", DateTime),
+    Column("total_points", Integer),
+    Column("points_paid", Integer),
+    Column("created_by", BigInteger, nullable=True, index=True),
+    Column("created_at", DateTime),
+    Column("cancelled_at", DateTime, nullable=True),
+)
+Table(
+    "payment_schedule_members", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("schedule_id", Integer, ForeignKey("payment_schedules.id")),
+    Column("user_id", BigInteger, index=True),
+    Column("created_at", DateTime),
+    Index("ix_payment_schedule_members_schedule_user", "schedule_id", "user_id"),
+)
+Table(
+    "payment_schedules_archive", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("organization_id", Integer, nullable=True),
+    Column("user_id", BigInteger, nullable=True),
+    Column("amount", Integer),
+    Column("interval_type", Enum(IntervalType)),
+    Column("interval_value", Integer),
+    Column("last_paid_at", DateTime),
+    Column("total_points", Integer),
+    Column("points_paid", Integer),
+    Column("created_by", BigInteger, nullable=True),
+    Column("created_at", DateTime),
+    Column("cancelled_at", DateTime, nullable=True),
+    Column("archived_at", DateTime),
+)
+Table(
+    "payment_schedule_members_archive", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("schedule_id", Integer, index=True),
+    Column("user_id", BigInteger, index=True),
+    Column("created_at", DateTime),
+)
+Table(
+    "payouts", SNOWFLAKE_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("schedule_id", Integer, nullable=False),
+    Column("organization_id", Integer, nullable=True),
+    Column("user_id", BigInteger, nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("paid_at", DateTime, nullable=False),
+    Index("ix_payouts_user_paid_at", "user_id", "paid_at", "id"),
+    Index("ix_payouts_schedule_paid_at", "schedule_id", "paid_at", "id"),
+)
+
+
+def _create_missing_indexes(conn, table: Table):
+    existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(conn)
+
+
+def _rebuild_sqlite_table(conn, table: Table, int_columns):
+    """
+    SQLite can't change a column type in place: build the new table under a
+    temporary name, copy the rows across casting ``int_columns``, then swap.
+    """
+    table_name = table.name
+    temp_name = f"_{table_name}_new"
+    # Copy the whole schema so foreign keys on the temporary table still resolve
+    metadata = MetaData()
+    for other in table.metadata.sorted_tables:
+        other.to_metadata(metadata)
+    conn.execute(CreateTable(table.to_metadata(metadata, name=temp_name)))
+
+    old_columns = {col["name"] for col in inspect(conn).get_columns(table_name)}
+    columns = [col.name for col in table.columns if col.name in old_columns]
+    select_list = ", ".join(
+        f"CAST({name} AS INTEGER)" if name in int_columns else name
+        for name in columns
+    )
+    column_list = ", ".join(columns)
+    conn.execute(text(
+        f"INSERT INTO {temp_name} ({column_list}) SELECT {select_list} FROM {table_name}"
+    ))
+    conn.execute(text(f"DROP TABLE {table_name}"))
+    conn.execute(text(f"ALTER TABLE {temp_name} RENAME TO {table_name}"))
+
+
+def _snowflake_columns_to_bigint(conn):
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table_name, column_names in SNOWFLAKE_COLUMNS.items():
+        if table_name not in existing_tables:
+            continue
+        types = {col["name"]: col["type"] for col in inspector.get_columns(table_name)}
+        to_convert = [
+            name for name in column_names
+            if name in types and not isinstance(types[name], Integer)
+        ]
+        table = SNOWFLAKE_SCHEMA.tables[table_name]
+        if to_convert:
+            if conn.dialect.name == "sqlite":
+                _rebuild_sqlite_table(conn, table, to_convert)
+            else:
+                # PostgreSQL
+                for name in to_convert:
+                    conn.execute(text(
+                        f"ALTER TABLE {table_name} ALTER COLUMN {name} "
+                        f"TYPE BIGINT USING {name}::bigint"
+                    ))
+        _create_missing_indexes(conn, table)
+
+
+# Single-column indexes superseded by the (guild_id, ...) composites
+GUILD_SUPERSEDED_INDEXES = {
+    "organizations": ("ix_organizations_name", "ix_organizations_owner_id"),
+    "payment_schedules": ("ix_payment_schedules_created_by",),
+}
+
+# The composites, as created by migration 3
+GUILD_INDEXES = {
+    "organizations": (
+        ("ix_organizations_guild_name", ("guild_id", "name"), True),
+        ("ix_organizations_guild_owner", ("guild_id", "owner_id"), False),
+    ),
+    "payment_schedules": (
+        ("ix_payment_schedules_guild_org", ("guild_id", "organization_id"), False),
+        ("ix_payment_schedules_guild_created_by", ("guild_id", "created_by"), False),
+    ),
+}
+
+
+def _partition_by_guild(conn):
+    """
+    Add guild_id to organizations and schedules.
+
+    Rows created before this migration have no guild; set LEGACY_GUILD_ID to
+    assign them to the guild a single-server deployment has been running in.
+    """
+    legacy_guild_id = os.getenv("LEGACY_GUILD_ID")
+    for table_name in ("organizations", "payment_schedules", "payment_schedules_archive"):
+        if not _has_column(conn, table_name, "guild_id"):
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN guild_id BIGINT"))
+        if legacy_guild_id:
+            conn.execute(
+                text(f"UPDATE {table_name} SET guild_id = :guild_id WHERE guild_id IS NULL"),
+                {"guild_id": int(legacy_guild_id)}
+            )
+
+    for table_name, index_names in GUILD_SUPERSEDED_INDEXES.items():
+        for index_name in index_names:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        existing = {index["name"] for index in inspect(conn).get_indexes(table_name)}
+        for index_name, columns, unique in GUILD_INDEXES[table_name]:
+            if index_name not in existing:
+                conn.execute(text(
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX {index_name} "
+                    f"ON {table_name} ({', '.join(columns)})"
+                ))
+
+
+def _add_schedule_spread(conn):
+    for table_name in ("payment_schedules", "payment_schedules_archive"):
+        if not _has_column(conn, table_name, "spread_seconds"):
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN spread_seconds INTEGER"))
+
+
+# Active schedule tables as of migration 5, now with AUTOINCREMENT keys
+AUTOINCREMENT_SCHEMA = MetaData()
+Table("organizations", AUTOINCREMENT_SCHEMA, Column("id", Integer, primary_key=True))
+Table(
+    "payment_schedules", AUTOINCREMENT_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("guild_id", BigInteger, nullable=True),
+    Column("organization_id", Integer, ForeignKey("organizations.id"), nullable=True),
+    Column("user_id", BigInteger, nullable=True),
+    Column("amount", Integer),
+    Column("interval_type", Enum(IntervalType)),
+    Column("interval_value", Integer),
+    Column("last_paid_at", DateTime),
+    Column("total_points", Integer),
+    Column("points_paid", Integer),
+    Column("created_by", BigInteger, nullable=True),
+    Column("created_at", DateTime),
+    Column("cancelled_at", DateTime, nullable=True),
+    Column("spread_seconds", Integer, nullable=True),
+    Index("ix_payment_schedules_guild_org", "guild_id", "organization_id"),
+    Index("ix_payment_schedules_guild_created_by", "guild_id", "created_by"),
+    sqlite_autoincrement=True,
+)
+Table(
+    "payment_schedule_members", AUTOINCREMENT_SCHEMA,
+    Column("id", Integer, primary_key=True),
+    Column("schedule_id", Integer, ForeignKey("payment_schedules.id")),
+    Column("user_id", BigInteger, index=True),
+    Column("created_at", DateTime),
+    Index("ix_payment_schedule_members_schedule_user", "schedule_id", "user_id"),
+    sqlite_autoincrement=True,
+)
+
+# Active table -> the archive table that keeps its IDs
+ARCHIVED_ID_TABLES = {
+    "payment_schedules": "payment_schedules_archive",
+    "payment_schedule_members": "payment_schedule_members_archive",
+}
+
+
+def _max_id(conn, table_name: str) -> int:
+    return conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}")).scalar()
+
+
+def _renumber_reused_schedule_ids(conn):
+    """
+    Give active rows whose ID an archived row already has a fresh ID.
+
+    Payouts and pay_org jobs made since the active schedule was created
+    follow it to the new ID; older payouts belong to the archived schedule.
+    """
+    next_id = max(_max_id(conn, "payment_schedules"), _max_id(conn, "payment_schedules_archive"))
+    reused = conn.execute(text(
+        "SELECT id, created_at FROM payment_schedules "
+        "WHERE id IN (SELECT id FROM payment_schedules_archive) ORDER BY id"
+    )).all()
+    jobs = conn.execute(text("SELECT id, payload FROM jobs")).all() if "jobs" in inspect(conn).get_table_names() else []
+    for old_id, created_at in reused:
+        next_id += 1
+        params = {"old_id": old_id, "new_id": next_id, "created_at": created_at}
+        conn.execute(text("UPDATE payment_schedules SET id = :new_id WHERE id = :old_id"), params)
+        conn.execute(text("UPDATE payment_schedule_members SET schedule_id = :new_id WHERE schedule_id = :old_id"), params)
+        conn.execute(text(
+            "UPDATE payouts SET schedule_id = :new_id WHERE schedule_id = :old_id AND paid_at >= :created_at"
+        ), params)
+        for job_id, payload in jobs:
+            data = json.loads(payload)
+            if data.get("schedule_id") == old_id:
+                data["schedule_id"] = next_id
+                conn.execute(text("UPDATE jobs SET payload = :payload WHERE id = :id"), {
+                    "payload": json.dumps(data), "id": job_id
+                })
+        logger.warning(f"Schedule #{old_id} reused an archived schedule's ID and is now #{next_id}")
+
+    # Membership rows aren't referenced elsewhere, a new ID is enough
+    next_id = max(_max_id(conn, "payment_schedule_members"), _max_id(conn, "payment_schedule_members_archive"))
+    for (old_id,) in conn.execute(text(
+        "SELECT id FROM payment_schedule_members "
+        "WHERE id IN (SELECT id FROM payment_schedule_members_archive) ORDER BY id"
+    )).all():
+        next_id += 1
+        conn.execute(text("UPDATE payment_schedule_members SET id = :new_id WHERE id = :old_id"), {
+            "old_id": old_id, "new_id": next_id
+        })
+
+
+def _never_reuse_schedule_ids(conn):
+    """
+    Stop SQLite from reusing the IDs of archived schedules.
+
+    Without AUTOINCREMENT SQLite hands out MAX(id) + 1, so archiving the
+    newest schedule frees its ID for the next one, which then clashes with
+    the archived row and mixes both schedules' payouts. Other backends use
+    sequences that never go backwards.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    _renumber_reused_schedule_ids(conn)
+    for table_name, archive_name in ARCHIVED_ID_TABLES.items():
+        table = AUTOINCREMENT_SCHEMA.tables[table_name]
+        sql = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table_name}
+        ).scalar()
+        if "AUTOINCREMENT" not in sql.upper():
+            _rebuild_sqlite_table(conn, table, ())
+            _create_missing_indexes(conn, table)
+        # Start new IDs above every ID already used, archived or not
+        seq = max(_max_id(conn, table_name), _max_id(conn, archive_name))
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table_name})
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {
+            "name": table_name, "seq": seq
+        })
+
+
+def _add_payout_job_id(conn):
+    """
+    Record which job made a payout, so a job's progress doesn't depend on
+    schedule IDs. Payouts already made by pay_org jobs are attributed by the
+    job's schedule and creation time.
+    """
+    if not _has_column(conn, "payouts", "job_id"):
+        conn.execute(text("ALTER TABLE payouts ADD COLUMN job_id INTEGER"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_payouts_job_user ON payouts (job_id, user_id)"))
+    for job_id, payload, created_at in conn.execute(
+        text("SELECT id, payload, created_at FROM jobs WHERE kind = 'pay_org'")
+    ).all():
+        conn.execute(text(
+            "UPDATE payouts SET job_id = :job_id "
+            "WHERE job_id IS NULL AND schedule_id = :schedule_id AND paid_at >= :created_at"
+        ), {"job_id": job_id, "schedule_id": json.loads(payload)["schedule_id"], "created_at": created_at})
+
+
+def _add_payout_guild_id(conn):
+    """
+    Record the guild a payout was made in, so payout history stays within
+    the guild it's viewed from. Existing payouts take their schedule's guild.
+    """
+    if not _has_column(conn, "payouts", "guild_id"):
+        conn.execute(text("ALTER TABLE payouts ADD COLUMN guild_id BIGINT"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_payouts_guild_user_paid_at "
+        "ON payouts (guild_id, user_id, paid_at, id)"
+    ))
+    # Active and archived schedule IDs are disjoint since migration 5
+    for table_name in ("payment_schedules", "payment_schedules_archive"):
+        conn.execute(text(
+            f"UPDATE payouts SET guild_id = (SELECT guild_id FROM {table_name} "
+            f"WHERE {table_name}.id = payouts.schedule_id) "
+            f"WHERE guild_id IS NULL AND schedule_id IN (SELECT id FROM {table_name})"
+        ))
+
+
+MIGRATIONS = [
+    (1, _add_schedule_cancelled_at),
+    (2, _snowflake_columns_to_bigint),
+    (3, _partition_by_guild),
+    (4, _add_schedule_spread),
+    (5, _never_reuse_schedule_ids),
+    (6, _add_payout_job_id),
+    (7, _add_payout_guild_id),
+]
+
+
+def run_migrations(engine) -> None:
+    """Apply every migration newer than the recorded schema version"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, applied_at DATETIME)"
+        ))
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    for version, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)"),
+                {"version": version, "applied_at": datetime.utcnow()}
+            )
+        logger.info(f"Applied schema migration {version}: {migration.__name__}")
@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select, tuple_
+
+from models.database import Payout
+
+# (paid_at, id) of a ledger row; pages are keyed on this, never on OFFSET
+Cursor = Tuple[datetime, int]
+
+
+def record_payouts(session, payouts: List[dict]) -> None:
+    """
+    Append payouts to the ledger in a single insert.
+
+    Each entry needs ``schedule_id``, ``user_id`` and ``amount`` and may carry
+    ``guild_id``, ``organization_id``, ``paid_at`` and ``job_id``. The caller
+    owns the transaction.
+    """
+    if not payouts:
+        return
+    now = datetime.utcnow()
+    session.execute(
+        insert(Payout),
+        [{"paid_at": now, "guild_id": None, "organization_id": None, "job_id": None, **payout} for payout in payouts]
+    )
+
+
+def fetch_payout_page(
+    session,
+    guild_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    schedule_id: Optional[int] = None,
+    before: Optional[Cursor] = None,
+    after: Optional[Cursor] = None,
+    limit: int = 10
+) -> Tuple[List[Payout], bool]:
+    """
+    Fetch one page of payouts, newest first, using keyset pagination.
+
+    Pass ``before`` with the last row of the current page to go to older
+    payouts, or ``after`` with the first row to go back to newer ones.
+    Returns the rows and whether another page exists in that direction.
+    """
+    query = select(Payout)
+    if guild_id is not None:
+        query = query.where(Payout.guild_id == guild_id)
+    if user_id is not None:
+        query = query.where(Payout.user_id == user_id)
+    if schedule_id is not None:
+        query = query.where(Payout.schedule_id == schedule_id)
+
+    key = tuple_(Payout.paid_at, Payout.id)
+    if after is not None:
+        query = query.where(key > tuple_(*after))\
+            .order_by(Payout.paid_at.asc(), Payout.id.asc())
+    else:
+        if before is not None:
+            query = query.where(key < tuple_(*before))
+        query = query.order_by(Payout.paid_at.desc(), Payout.id.desc())
+
+    rows = session.execute(query.limit(limit + 1)).scalars().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is not None:
+        rows.reverse()
+    return rows, has_more
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, or_, select
+
+from models.database import (
+    ArchivedPaymentSchedule,
+    ArchivedPaymentScheduleMember,
+    PaymentSchedule,
+    PaymentScheduleMember,
+)
+
+SCHEDULE_COLUMNS = (
+    "id", "guild_id", "organization_id", "user_id", "amount", "interval_type", "interval_value",
+    "last_paid_at", "total_points", "points_paid", "created_by", "created_at", "cancelled_at",
+    "spread_seconds",
+)
+MEMBER_COLUMNS = ("id", "schedule_id", "user_id", "created_at")
+
+
+def finished_schedule_filter():
+    """Schedules that are fully paid or cancelled and no longer need processing"""
+    return or_(
+        PaymentSchedule.points_paid >= PaymentSchedule.total_points,
+        PaymentSchedule.cancelled_at.isnot(None)
+    )
+
+
+def archive_finished_schedules(session, batch_size: int = 500) -> int:
+    """
+    Move one batch of finished schedules and their members into the archive tables.
+
+    Runs as INSERT ... SELECT / DELETE statements keyed on a batch of IDs, so the
+    rows never round-trip through Python. Returns the number of schedules moved.
+    """
+    batch_ids = session.execute(
+        select(PaymentSchedule.id)
+        .where(finished_schedule_filter())
+        .order_by(PaymentSchedule.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not batch_ids:
+        return 0
+
+    archived_at = datetime.utcnow()
+    session.execute(
+        insert(ArchivedPaymentSchedule).from_select(
+            [*SCHEDULE_COLUMNS, "archived_at"],
+            select(
+                *(getattr(PaymentSchedule, column) for column in SCHEDULE_COLUMNS),
+                literal(archived_at)
+            ).where(PaymentSchedule.id.in_(batch_ids))
+        )
+    )
+    session.execute(
+        insert(ArchivedPaymentScheduleMember).from_select(
+            MEMBER_COLUMNS,
+            select(
+                *(getattr(PaymentScheduleMember, column) for column in MEMBER_COLUMNS)
+            ).where(PaymentScheduleMember.schedule_id.in_(batch_ids))
+        )
+    )
+    session.execute(
+        delete(PaymentScheduleMember)
+        .where(PaymentScheduleMember.schedule_id.in_(batch_ids))
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(
+        delete(PaymentSchedule)
+        .where(PaymentSchedule.id.in_(batch_ids))
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return len(batch_ids)
+
+
+def find_schedule(session, schedule_id: int, guild_id: Optional[int]):
+    """Look up a guild's schedule in the active table, falling back to the archive"""
+    schedule = session.get(PaymentSchedule, schedule_id)
+    if schedule is None:
+        schedule = session.get(ArchivedPaymentSchedule, schedule_id)
+    if schedule is None or schedule.guild_id != guild_id:
+        return None
+    return schedule
+
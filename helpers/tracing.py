@@ -0,0 +1,214 @@
+"""
+Per-interaction latency tracing.
+
+Every app command and view/modal callback runs inside an ``InteractionTrace``
+held in a context variable. While it is active, time spent in database
+statements, DRIP requests and Discord REST calls is added to the trace's
+phases. On completion the total and per-phase durations feed the command
+histograms on /metrics, and interactions slower than the threshold are
+written to the slow-command log with their breakdown.
+
+Context variables are copied into ``asyncio.to_thread`` workers, so database
+work pushed off the event loop is still attributed to the right command.
+
+The command tree, view and modal hooks below override private discord.py
+methods (``CommandTree._call`` and the ``_scheduled_task`` of views and
+modals), which is why requirements.txt pins discord.py to an exact version.
+Check these overrides against the new source before upgrading it.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+import aiohttp
+import discord
+from discord import app_commands
+from sqlalchemy import event
+
+from helpers.metrics import registry
+
+PHASE_DATABASE = "database"
+PHASE_POINTS = "points"
+PHASE_DISCORD = "discord"
+
+SLOW_COMMAND_THRESHOLD = float(os.getenv("SLOW_COMMAND_THRESHOLD", "2.0"))
+
+slow_logger = logging.getLogger("discord_bot.slow_commands")
+
+command_duration = registry.histogram(
+    "celeris_command_duration_seconds",
+    "Total time to handle an app command or component interaction"
+)
+command_phase_duration = registry.histogram(
+    "celeris_command_phase_seconds",
+    "Time an interaction spent in the database, DRIP or Discord REST"
+)
+
+_current_trace: ContextVar[Optional["InteractionTrace"]] = ContextVar("current_trace", default=None)
+
+
+class InteractionTrace:
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.phases: Dict[str, float] = {}
+        self.failed = False
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish(self, total: float) -> None:
+        command_duration.observe(total, command=self.name, kind=self.kind)
+        for phase, seconds in self.phases.items():
+            command_phase_duration.observe(seconds, command=self.name, phase=phase)
+
+        if total >= SLOW_COMMAND_THRESHOLD:
+            # Phases can overlap when a command gathers work, so clamp the remainder
+            other = max(total - sum(self.phases.values()), 0.0)
+            breakdown = ", ".join(
+                f"{phase}={seconds * 1000:.0f}ms" for phase, seconds in sorted(self.phases.items())
+            )
+            slow_logger.warning(
+                f"Slow {self.kind} '{self.name}' took {total * 1000:.0f}ms ({breakdown or 'no phases'}, other={other * 1000:.0f}ms)",
+                extra={
+                    "command": self.name,
+                    "kind": self.kind,
+                    "total_ms": round(total * 1000, 1),
+                    "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+                    "failed": self.failed,
+                }
+            )
+
+
+@contextmanager
+def trace_interaction(kind: str, name: str):
+    """Run the enclosed interaction handler under a new trace."""
+    trace = InteractionTrace(kind, name)
+    token = _current_trace.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    except BaseException:
+        trace.failed = True
+        raise
+    finally:
+        _current_trace.reset(token)
+        trace.finish(time.perf_counter() - start)
+
+
+def mark_failed() -> None:
+    """Flag the current trace as failed, for errors discord.py handles itself."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.failed = True
+
+
+@contextmanager
+def trace_phase(phase: str):
+    """Add the enclosed block's duration to ``phase`` of the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(phase, time.perf_counter() - start)
+
+
+def http_trace_config(phase: str) -> aiohttp.TraceConfig:
+    """An aiohttp trace config attributing every request on a session to ``phase``."""
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_done(session, context, params):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(phase, time.perf_counter() - context.start)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_done)
+    config.on_request_exception.append(on_request_done)
+    return config
+
+
+def install_database_tracing(engine) -> None:
+    """Attribute statement execution time on ``engine`` to the database phase."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("trace_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["trace_query_start"].pop()
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(PHASE_DATABASE, time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("trace_query_start"):
+            connection.info["trace_query_start"].pop()
+
+
+class TracedCommandTree(app_commands.CommandTree):
+    """Command tree that traces every app command and autocomplete call."""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete else "command"
+        with trace_interaction(kind, _command_name(interaction)) as trace:
+            await super()._call(interaction)
+            # _call routes command errors to the error handlers instead of raising
+            trace.failed = trace.failed or interaction.command_failed
+
+
+class TracedView(discord.ui.View):
+    """View whose component callbacks are traced as ``ViewName.callback_name``."""
+
+    async def _scheduled_task(self, item: discord.ui.Item, interaction: discord.Interaction):
+        with trace_interaction("component", f"{type(self).__name__}.{_item_name(item)}"):
+            await super()._scheduled_task(item, interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item) -> None:
+        # _scheduled_task catches callback errors and hands them here
+        mark_failed()
+        await super().on_error(interaction, error, item)
+
+
+class TracedModal(discord.ui.Modal):
+    """Modal whose submissions are traced under the modal's class name."""
+
+    async def _scheduled_task(self, interaction: discord.Interaction, components):
+        with trace_interaction("modal", type(self).__name__):
+            await super()._scheduled_task(interaction, components)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception) -> None:
+        mark_failed()
+        await super().on_error(interaction, error)
+
+
+def _item_name(item: discord.ui.Item) -> str:
+    # Auto-generated custom_ids are random, so label by the decorated callback
+    # to keep the metric label set bounded
+    callback = getattr(item.callback, "callback", None)
+    return getattr(callback, "__name__", None) or type(item).__name__
+
+
+def _command_name(interaction: discord.Interaction) -> str:
+    # The tree resolves interaction.command inside _call, so rebuild the
+    # qualified name from the raw payload: the command plus any subcommands
+    data = interaction.data or {}
+    parts = [data.get("name", "unknown")]
+    options = data.get("options") or []
+    while options and options[0].get("type") in (1, 2):
+        parts.append(options[0]["name"])
+        options = options[0].get("options") or []
+    return " ".join(parts)
@@ -1,6 +1,6 @@
 from datetime import datetime
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, create_engine
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, ForeignKey, DateTime, Enum, Index, create_engine
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -26,51 +26,173 @@ class IntervalType(enum.Enum):
             return 2592000  # Approximately 30 days
         return 0
 
+class JobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class Organization(Base):
     __tablename__ = 'organizations'
     
     id = Column(Integer, primary_key=True)
+    guild_id = Column(BigInteger, nullable=True)  # Discord guild the organization belongs to
     name = Column(String)
-    owner_id = Column(String)  # Discord user ID
+    owner_id = Column(BigInteger)  # Discord user ID
     created_at = Column(DateTime, default=datetime.utcnow)
     
     members = relationship("OrganizationMember", back_populates="organization")
     payment_schedules = relationship("PaymentSchedule", back_populates="organization")
 
+    __table_args__ = (
+        Index('ix_organizations_guild_name', 'guild_id', 'name', unique=True),
+        Index('ix_organizations_guild_owner', 'guild_id', 'owner_id'),
+    )
+
 class OrganizationMember(Base):
     __tablename__ = 'organization_members'
     
     id = Column(Integer, primary_key=True)
     organization_id = Column(Integer, ForeignKey('organizations.id'))
-    user_id = Column(String)  # Discord user ID
+    user_id = Column(BigInteger, index=True)  # Discord user ID
     joined_at = Column(DateTime, default=datetime.utcnow)
     
     organization = relationship("Organization", back_populates="members")
 
+    __table_args__ = (
+        Index('ix_organization_members_org_user', 'organization_id', 'user_id'),
+    )
+
 class PaymentSchedule(Base):
     __tablename__ = 'payment_schedules'
     
     id = Column(Integer, primary_key=True)
+    guild_id = Column(BigInteger, nullable=True)  # Discord guild the schedule was created in
     organization_id = Column(Integer, ForeignKey('organizations.id'), nullable=True)
-    user_id = Column(String, nullable=True)  # Discord user ID for individual schedules
+    user_id = Column(BigInteger, nullable=True)  # Discord user ID for individual schedules
     amount = Column(Integer)
     interval_type = Column(Enum(IntervalType))
     interval_value = Column(Integer)
     last_paid_at = Column(DateTime, default=datetime.utcnow)
     total_points = Column(Integer)
     points_paid = Column(Integer, default=0)
-    created_by = Column(String, nullable=True)
+    created_by = Column(BigInteger, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    cancelled_at = Column(DateTime, nullable=True)  # Set on cancel, row is archived by compaction
+    spread_seconds = Column(Integer, nullable=True)  # Window payouts are staggered across, see PaymentScheduler
     
     organization = relationship("Organization", back_populates="payment_schedules")
     members = relationship("PaymentScheduleMember", back_populates="schedule")
 
+    __table_args__ = (
+        Index('ix_payment_schedules_guild_org', 'guild_id', 'organization_id'),
+        Index('ix_payment_schedules_guild_created_by', 'guild_id', 'created_by'),
+        # IDs must never be reused once a schedule moves to the archive, which keeps its ID
+        {'sqlite_autoincrement': True},
+    )
+
 class PaymentScheduleMember(Base):
     __tablename__ = 'payment_schedule_members'
     
     id = Column(Integer, primary_key=True)
     schedule_id = Column(Integer, ForeignKey('payment_schedules.id'))
-    user_id = Column(String)  # Discord user ID
+    user_id = Column(BigInteger, index=True)  # Discord user ID
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    schedule = relationship("PaymentSchedule", back_populates="members")
+
+    __table_args__ = (
+        Index('ix_payment_schedule_members_schedule_user', 'schedule_id', 'user_id'),
+        {'sqlite_autoincrement': True},
+    )
+
+class ArchivedPaymentSchedule(Base):
+    """Completed or cancelled schedules moved out of the active table"""
+    __tablename__ = 'payment_schedules_archive'
+
+    id = Column(Integer, primary_key=True)  # Same ID as the original schedule
+    guild_id = Column(BigInteger, nullable=True)
+    organization_id = Column(Integer, nullable=True)
+    user_id = Column(BigInteger, nullable=True)
+    amount = Column(Integer)
+    interval_type = Column(Enum(IntervalType))
+    interval_value = Column(Integer)
+    last_paid_at = Column(DateTime)
+    total_points = Column(Integer)
+    points_paid = Column(Integer)
+    created_by = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime)
+    cancelled_at = Column(DateTime, nullable=True)
+    spread_seconds = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    members = relationship(
+        "ArchivedPaymentScheduleMember",
+        back_populates="schedule",
+        primaryjoin="ArchivedPaymentSchedule.id == foreign(ArchivedPaymentScheduleMember.schedule_id)"
+    )
+
+class ArchivedPaymentScheduleMember(Base):
+    __tablename__ = 'payment_schedule_members_archive'
+
+    id = Column(Integer, primary_key=True)  # Same ID as the original membership row
+    schedule_id = Column(Integer, index=True)
+    user_id = Column(BigInteger, index=True)
+    created_at = Column(DateTime)
+
+    schedule = relationship(
+        "ArchivedPaymentSchedule",
+        back_populates="members",
+        primaryjoin="ArchivedPaymentSchedule.id == foreign(ArchivedPaymentScheduleMember.schedule_id)"
+    )
+
+class Payout(Base):
+    """Append-only ledger of every individual payout made by a schedule"""
+    __tablename__ = 'payouts'
+
+    id = Column(Integer, primary_key=True)
+    schedule_id = Column(Integer, nullable=False)  # No FK, schedules move to the archive
+    organization_id = Column(Integer, nullable=True)
+    user_id = Column(BigInteger, nullable=False)  # Discord user ID of the recipient
+    amount = Column(Integer, nullable=False)
+    paid_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    job_id = Column(Integer, nullable=True)  # Background job that made the payout, if any
+    guild_id = Column(BigInteger, nullable=True)  # Discord guild of the paying schedule
+
+    __table_args__ = (
+        Index('ix_payouts_guild_user_paid_at', 'guild_id', 'user_id', 'paid_at', 'id'),
+        Index('ix_payouts_user_paid_at', 'user_id', 'paid_at', 'id'),
+        Index('ix_payouts_schedule_paid_at', 'schedule_id', 'paid_at', 'id'),
+        Index('ix_payouts_job_user', 'job_id', 'user_id'),
+    )
+
+class Job(Base):
+    """A long-running fan-out (e.g. a pay_org initial payment) run in the background"""
+    __tablename__ = 'jobs'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # Name the handler is registered under
+    guild_id = Column(BigInteger, nullable=True)
+    created_by = Column(BigInteger, nullable=False)  # Discord user ID
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON arguments for the handler
+    total_items = Column(Integer, default=0, nullable=False)
+    completed_items = Column(Integer, default=0, nullable=False)
+    failed_items = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_jobs_status', 'status'),
+        Index('ix_jobs_guild_created_by', 'guild_id', 'created_by'),
+    )
+
+class CooldownBucket(Base):
+    """Saved token-bucket state so command cooldowns survive restarts"""
+    __tablename__ = 'cooldown_buckets'
 
-    schedule = relationship("PaymentSchedule", back_populates="members")
\ No newline at end of file
+    key = Column(String, primary_key=True)  # "<command>:user:<id>" or "<command>:guild:<id>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # Epoch seconds
+    full_at = Column(Float, nullable=False, index=True)  # When the bucket has refilled; rows past it are dropped
@@ -0,0 +1,79 @@
+"""
+Standalone payment scheduler.
+
+Runs the same payment and compaction loops as the bot, against the same
+database and DRIP realm, without a gateway connection. Payment DMs are sent
+over Discord's REST API. Start the bot with IN_BOT_SCHEDULER=0 so that only
+this process pays out:
+
+    python -m scheduler_worker
+"""
+import asyncio
+import logging
+import os
+import signal
+
+import discord
+from dotenv import load_dotenv
+
+from helpers.DatabaseManager import DatabaseManager
+from helpers.PaymentScheduler import PaymentScheduler
+from helpers.SimplePointsManager import PointsManagerSingleton
+from helpers.PointsClientRegistry import PointsClientRegistry
+from helpers.logging_config import setup_logging
+
+logger = logging.getLogger("discord_bot.scheduler")
+
+
+async def main() -> None:
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "celeris.db")
+    db_manager = DatabaseManager.get_instance(os.getenv("DATABASE_URL") or f"sqlite:///{db_path}")
+    points_manager = PointsManagerSingleton(
+        base_url=os.getenv("API_BASE_URL"),
+        api_key=os.getenv("API_KEY"),
+        realm_id=os.getenv("REALM_ID")
+    )
+    points_clients = PointsClientRegistry.from_env(points_manager)
+
+    # REST-only client: logging in is enough for fetch_user and DMs
+    client = discord.Client(intents=discord.Intents.none())
+    await client.login(os.getenv("DISCORD_TOKEN"))
+
+    scheduler = PaymentScheduler(client, db_manager, points_clients, logger)
+    points_clients.start()
+    task = asyncio.create_task(scheduler.run())
+
+    def stop() -> None:
+        logger.info("Scheduler worker stopping")
+        # Drain rather than cancel: the payment pass in flight gets to record
+        # the payouts DRIP has already applied
+        stopping.append(asyncio.create_task(scheduler.close()))
+
+    stopping = []
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop)
+
+    logger.info("Scheduler worker started")
+    try:
+        await task
+        await asyncio.gather(*stopping)
+    finally:
+        await points_clients.close()
+        await points_manager.cleanup()
+        await client.close()
+
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    log_listener = setup_logging(
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+        log_file=os.getenv("SCHEDULER_LOG_FILE", "scheduler.log"),
+        max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+        json_file=os.getenv("LOG_FORMAT", "").lower() == "json"
+    )
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
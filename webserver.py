@@ -1,15 +1,114 @@
-from flask import Flask
-from threading import Thread
+import asyncio
+import math
+import time
 
-app = Flask('')
+from aiohttp import web
+from sqlalchemy import text
 
-@app.route('/')
-def home():
-    return "Celeris is running!"
+from helpers.metrics import registry
 
-def run():
-    app.run(host="0.0.0.0", port=8080)
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
+class WebServer:
+    """
+    Health, readiness and metrics endpoints served from the bot's own event loop.
+
+    /healthz  gateway connected
+    /readyz   database and DRIP reachable, with latencies
+    /metrics  Prometheus text format
+    """
+
+    def __init__(self, bot, host: str = "0.0.0.0", port: int = 8080):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.started_at = time.time()
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/", self.home)
+        self.app.router.add_get("/healthz", self.healthz)
+        self.app.router.add_get("/readyz", self.readyz)
+        self.app.router.add_get("/metrics", self.metrics)
+
+        registry.gauge(
+            "celeris_up", "Whether the gateway connection is ready",
+            callback=lambda: int(self._gateway_connected())
+        )
+        registry.gauge(
+            "celeris_gateway_latency_seconds", "Gateway heartbeat latency",
+            callback=lambda: self.bot.latency if math.isfinite(self.bot.latency) else -1
+        )
+        registry.gauge(
+            "celeris_guilds", "Number of guilds the bot is in",
+            callback=lambda: len(self.bot.guilds)
+        )
+        registry.gauge(
+            "celeris_uptime_seconds", "Seconds since the process started serving",
+            callback=lambda: time.time() - self.started_at
+        )
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.bot.logger.info(f"Web server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _gateway_connected(self) -> bool:
+        return self.bot.is_ready() and not self.bot.is_closed() and math.isfinite(self.bot.latency)
+
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="Celeris is running!")
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        connected = self._gateway_connected()
+        return web.json_response(
+            {
+                "status": "ok" if connected else "unavailable",
+                "gateway_latency_ms": round(self.bot.latency * 1000, 1) if connected else None,
+                "shards": self.bot.shard_monitor.status(),
+            },
+            status=200 if connected else 503
+        )
+
+    def _check_database(self) -> None:
+        session = self.bot.db_manager.Session()
+        try:
+            session.execute(text("SELECT 1"))
+        finally:
+            session.close()
+
+    async def _timed_check(self, check) -> dict:
+        start = time.perf_counter()
+        result = {}
+        try:
+            # Checks return False for "reachable but unhealthy", anything else is healthy
+            result["ok"] = await asyncio.wait_for(check(), timeout=3) is not False
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        database, drip = await asyncio.gather(
+            self._timed_check(lambda: asyncio.to_thread(self._check_database)),
+            self._timed_check(self.bot.points_manager.ping),
+        )
+        ready = database["ok"] and drip["ok"]
+        return web.json_response(
+            {"status": "ready" if ready else "not ready", "database": database, "drip": drip},
+            status=200 if ready else 503
+        )
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(),
+            content_type="text/plain",
+            charset="utf-8"
+        )